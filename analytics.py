@@ -0,0 +1,105 @@
+import datetime
+from database import get_db_connection
+
+# meta key holding the id of the last attempt folded into the rollups
+WATERMARK_KEY = "rollup_attempt_id"
+# Attempt ids folded per transaction
+ROLLUP_BATCH_SIZE = 5000
+# Window shown on the dashboard stats panel
+STATS_DAYS = 30
+# Calendar day of an attempt, in local time like the stats panel; every
+# per-day table (rollups and attempts_compacted) groups by this
+DAY_SQL = "date(ts, 'unixepoch', 'localtime')"
+
+def get_watermark(conn):
+    row = conn.execute('SELECT value FROM meta WHERE key = ?', (WATERMARK_KEY,)).fetchone()
+    return int(row[0]) if row else 0
+
+def refresh_rollups(batch_size=ROLLUP_BATCH_SIZE):
+    """Fold attempts newer than the watermark into the daily rollup tables.
+
+    Each batch reads the watermark, updates both rollups and advances the
+    watermark in one BEGIN IMMEDIATE transaction, so neither a crash nor a
+    concurrent run (startup jobs and the dashboard both call this) counts an
+    attempt twice. Returns the number of attempts folded by this call.
+    """
+    conn = get_db_connection()
+    try:
+        end_id = conn.execute('SELECT max(id) FROM attempts').fetchone()[0] or 0
+        total = 0
+        while True:
+            # Take the write lock before reading the watermark
+            conn.execute('BEGIN IMMEDIATE')
+            watermark = get_watermark(conn)
+            if watermark >= end_id:
+                conn.rollback()
+                break
+            batch_end = min(watermark + batch_size, end_id)
+            params = (watermark + 1, batch_end)
+            conn.execute(f'''INSERT INTO daily_user_stats (user_id, day, attempts, correct, latency_ms_sum)
+                            SELECT user_id, {DAY_SQL}, count(*), sum(correct), coalesce(sum(latency_ms), 0)
+                            FROM attempts WHERE id BETWEEN ? AND ?
+                            GROUP BY user_id, {DAY_SQL}
+                            ON CONFLICT(user_id, day) DO UPDATE SET
+                                attempts = attempts + excluded.attempts,
+                                correct = correct + excluded.correct,
+                                latency_ms_sum = latency_ms_sum + excluded.latency_ms_sum''', params)
+            conn.execute(f'''INSERT INTO daily_word_stats (word_id, day, attempts, correct, latency_ms_sum)
+                            SELECT word_id, {DAY_SQL}, count(*), sum(correct), coalesce(sum(latency_ms), 0)
+                            FROM attempts WHERE id BETWEEN ? AND ?
+                            GROUP BY word_id, {DAY_SQL}
+                            ON CONFLICT(word_id, day) DO UPDATE SET
+                                attempts = attempts + excluded.attempts,
+                                correct = correct + excluded.correct,
+                                latency_ms_sum = latency_ms_sum + excluded.latency_ms_sum''', params)
+            total += conn.execute('SELECT count(*) FROM attempts WHERE id BETWEEN ? AND ?', params).fetchone()[0]
+            conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (WATERMARK_KEY, str(batch_end)))
+            conn.commit()
+        return total
+    finally:
+        conn.close()
+
+def get_user_stats(user_id, days=STATS_DAYS):
+    """Accuracy, average answer time, today's attempts and current streak, from the rollups only."""
+    today = datetime.date.today()
+    since = (today - datetime.timedelta(days=days - 1)).isoformat()
+    conn = get_db_connection()
+    try:
+        totals = conn.execute('''SELECT coalesce(sum(attempts), 0), coalesce(sum(correct), 0), coalesce(sum(latency_ms_sum), 0)
+                                 FROM daily_user_stats WHERE user_id = ? AND day >= ?''', (user_id, since)).fetchone()
+        row = conn.execute('SELECT attempts FROM daily_user_stats WHERE user_id = ? AND day = ?',
+                           (user_id, today.isoformat())).fetchone()
+        # Streak: consecutive active days ending today (or yesterday, if nothing yet today)
+        streak = 0
+        expected = today if row else today - datetime.timedelta(days=1)
+        for (day,) in conn.execute('SELECT day FROM daily_user_stats WHERE user_id = ? AND day <= ? ORDER BY day DESC',
+                                   (user_id, expected.isoformat())):
+            if day != expected.isoformat():
+                break
+            streak += 1
+            expected -= datetime.timedelta(days=1)
+    finally:
+        conn.close()
+
+    attempts, correct, latency_sum = totals
+    return {
+        "days": days,
+        "attempts": attempts,
+        "accuracy": correct / attempts if attempts else None,
+        "avg_latency_ms": latency_sum / attempts if attempts else None,
+        "today": row[0] if row else 0,
+        "streak": streak,
+    }
+
+def get_word_stats(word_id, days=STATS_DAYS):
+    """(attempts, accuracy) for one word across all users over the last `days` days."""
+    since = (datetime.date.today() - datetime.timedelta(days=days - 1)).isoformat()
+    conn = get_db_connection()
+    row = conn.execute('''SELECT coalesce(sum(attempts), 0), coalesce(sum(correct), 0)
+                          FROM daily_word_stats WHERE word_id = ? AND day >= ?''', (word_id, since)).fetchone()
+    conn.close()
+    attempts, correct = row
+    return attempts, (correct / attempts if attempts else None)
+
+if __name__ == "__main__":
+    print(f"Folded {refresh_rollups()} attempts")
@@ -0,0 +1,43 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import database
+
+# Blocking SQLite/file/network work runs here instead of on the Flet event loop
+DB_WORKERS = 8
+_executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="db")
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking callable on the shared executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+def _wrap(func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(func, *args, **kwargs)
+    return wrapper
+
+# Async versions of the database.py API used by event handlers
+get_user = _wrap(database.get_user)
+get_user_id = _wrap(database.get_user_id)
+create_user = _wrap(database.create_user)
+set_last_user = _wrap(database.set_last_user)
+get_words_by_level = _wrap(database.get_words_by_level)
+get_words_page = _wrap(database.get_words_page)
+count_words_in_level = _wrap(database.count_words_in_level)
+update_user_progress = _wrap(database.update_user_progress)
+reset_user_progress_for_level = _wrap(database.reset_user_progress_for_level)
+get_level_progress = _wrap(database.get_level_progress)
+set_level_progress = _wrap(database.set_level_progress)
+set_shuffle_seed = _wrap(database.set_shuffle_seed)
+delete_word = _wrap(database.delete_word)
+delete_words_bulk = _wrap(database.delete_words_bulk)
+update_word = _wrap(database.update_word)
+move_words_to_level = _wrap(database.move_words_to_level)
+replace_in_words = _wrap(database.replace_in_words)
+update_words_bulk = _wrap(database.update_words_bulk)
+increment_word_error = _wrap(database.increment_word_error)
+get_difficult_words_page = _wrap(database.get_difficult_words_page)
+count_difficult_words = _wrap(database.count_difficult_words)
+remove_from_difficult = _wrap(database.remove_from_difficult)
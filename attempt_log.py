@@ -0,0 +1,110 @@
+import time
+import atexit
+import threading
+from database import get_db_connection
+
+# Buffered rows are written once this many are pending...
+FLUSH_SIZE = 50
+# ...or this many seconds after the first pending row
+FLUSH_INTERVAL = 2.0
+# Raw attempts older than this are folded into attempts_compacted
+RETENTION_DAYS = 90
+# Attempt ids handled per compaction transaction
+COMPACT_BATCH_SIZE = 5000
+
+class AttemptBuffer:
+    """Collects answer attempts in memory and writes them with one executemany.
+
+    record() never touches the database itself; writes happen on a timer or
+    a short-lived worker thread, so answer handlers stay fast.
+    """
+
+    def __init__(self, flush_size=FLUSH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._rows = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    def record(self, user_id, word_id, correct, latency_ms=None):
+        row = (user_id, word_id, 1 if correct else 0, latency_ms, int(time.time()))
+        with self._lock:
+            self._rows.append(row)
+            full = len(self._rows) >= self.flush_size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            threading.Thread(target=self.flush, name="attempt-flush", daemon=True).start()
+
+    def flush(self):
+        """Write all pending attempts in a single transaction. Returns the row count."""
+        with self._lock:
+            rows, self._rows = self._rows, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not rows:
+            return 0
+        # Serialize writers so batches land in order
+        with self._flush_lock:
+            conn = get_db_connection()
+            try:
+                conn.executemany('INSERT INTO attempts (user_id, word_id, correct, latency_ms, ts) VALUES (?, ?, ?, ?, ?)', rows)
+                conn.commit()
+            finally:
+                conn.close()
+        return len(rows)
+
+_buffer = AttemptBuffer()
+record_attempt = _buffer.record
+flush_attempts = _buffer.flush
+
+# Don't lose the last few attempts when the app exits
+atexit.register(flush_attempts)
+
+def compact_attempts(retention_days=RETENTION_DAYS, batch_size=COMPACT_BATCH_SIZE):
+    """Fold raw attempts older than the retention window into attempts_compacted.
+
+    Works through the old id range in batches (one short transaction each):
+    each batch is aggregated per user/word/day and then deleted. Only attempts
+    already counted by the daily rollups (analytics.py) are compacted. Returns the
+    number of raw rows compacted.
+    """
+    cutoff = int(time.time()) - retention_days * 86400
+    conn = get_db_connection()
+    try:
+        # Ids grow with time, so everything below the first recent id is old
+        row = conn.execute('SELECT id FROM attempts WHERE ts >= ? ORDER BY id LIMIT 1', (cutoff,)).fetchone()
+        if row:
+            end_id = row[0] - 1
+        else:
+            end_id = conn.execute('SELECT max(id) FROM attempts').fetchone()[0] or 0
+        # Never drop attempts the daily rollups haven't folded in yet
+        from analytics import get_watermark, DAY_SQL
+        end_id = min(end_id, get_watermark(conn))
+        start_id = conn.execute('SELECT min(id) FROM attempts').fetchone()[0]
+        if start_id is None or start_id > end_id:
+            return 0
+
+        total = 0
+        while start_id <= end_id:
+            batch_end = min(start_id + batch_size - 1, end_id)
+            conn.execute(f'''INSERT INTO attempts_compacted (user_id, word_id, day, attempts, correct, latency_ms_sum)
+                            SELECT user_id, word_id, {DAY_SQL}, count(*), sum(correct), coalesce(sum(latency_ms), 0)
+                            FROM attempts WHERE id BETWEEN ? AND ?
+                            GROUP BY user_id, word_id, {DAY_SQL}
+                            ON CONFLICT(user_id, word_id, day) DO UPDATE SET
+                                attempts = attempts + excluded.attempts,
+                                correct = correct + excluded.correct,
+                                latency_ms_sum = latency_ms_sum + excluded.latency_ms_sum''',
+                         (start_id, batch_end))
+            cur = conn.execute('DELETE FROM attempts WHERE id BETWEEN ? AND ?', (start_id, batch_end))
+            conn.commit()
+            total += cur.rowcount
+            start_id = batch_end + 1
+        return total
+    finally:
+        conn.close()
@@ -0,0 +1,26 @@
+import os
+import hashlib
+import tempfile
+
+# Synthesized clips are cached by text, so replaying a word needs no network call
+AUDIO_CACHE_DIR = os.path.join(tempfile.gettempdir(), "english_mastery_tts")
+
+def synthesize(text, lang="en"):
+    """Return the path of an mp3 pronouncing `text`, generating it with gTTS if needed."""
+    os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+    key = hashlib.sha1(f"{lang}:{text}".encode("utf-8")).hexdigest()[:16]
+    fpath = os.path.join(AUDIO_CACHE_DIR, f"tts_{key}.mp3")
+    if os.path.exists(fpath) and os.path.getsize(fpath) > 0:
+        return fpath
+
+    # gTTS pulls in requests; import on first use instead of at startup
+    from gtts import gTTS
+    tmp_path = fpath + ".part"
+    gTTS(text, lang=lang).save(tmp_path)
+    os.replace(tmp_path, fpath)
+    return fpath
+
+async def synthesize_async(text, lang="en"):
+    """synthesize() on the shared executor, for async handlers."""
+    from async_db import run_blocking
+    return await run_blocking(synthesize, text, lang)
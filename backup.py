@@ -0,0 +1,197 @@
+import os
+import sqlite3
+import threading
+import datetime
+from database import get_db_path
+
+# Pages copied per backup step; the source is only read-locked during a step,
+# so the learning view can keep writing between steps
+BACKUP_PAGES_PER_STEP = 64
+# Pause between steps (seconds)
+BACKUP_STEP_SLEEP = 0.005
+# Number of snapshots kept by rotation
+BACKUP_KEEP = 5
+# Interval for the automatic backup scheduler (seconds); None disables it
+AUTO_BACKUP_INTERVAL = 6 * 60 * 60
+
+SNAPSHOT_PREFIX = "progress-"
+SNAPSHOT_SUFFIX = ".db"
+
+def log_backup(msg):
+    log_file = os.path.join(os.path.expanduser("~"), "english_mastery_debug.log")
+    try:
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(f"[{timestamp}] [BACKUP] {msg}\n")
+    except: pass
+
+def get_backup_dir():
+    """Snapshots live in a 'backups' folder next to the database."""
+    path = os.path.join(os.path.dirname(get_db_path()), "backups")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def _snapshot_key(name):
+    """Sort key of a snapshot name (its timestamp fields as ints), or None if it isn't one.
+
+    Names are progress-YYYYmmdd-HHMMSS[-microseconds[-n]].db; older
+    versions wrote them without microseconds.
+    """
+    if not (name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX)):
+        return None
+    fields = name[len(SNAPSHOT_PREFIX):-len(SNAPSHOT_SUFFIX)].split("-")
+    if len(fields) < 2 or not all(f.isdigit() for f in fields):
+        return None
+    return tuple(int(f) for f in fields)
+
+def list_backups(backup_dir=None):
+    """Return snapshot paths, newest first."""
+    backup_dir = backup_dir or get_backup_dir()
+    names = [n for n in os.listdir(backup_dir) if _snapshot_key(n) is not None]
+    return [os.path.join(backup_dir, n) for n in sorted(names, key=_snapshot_key, reverse=True)]
+
+def _copy(src_path, dst_path, progress=None):
+    src = sqlite3.connect(src_path)
+    dst = sqlite3.connect(dst_path)
+    try:
+        src.backup(dst, pages=BACKUP_PAGES_PER_STEP, progress=progress, sleep=BACKUP_STEP_SLEEP)
+    finally:
+        dst.close()
+        src.close()
+
+def verify_backup(path):
+    """Return True if the snapshot passes SQLite's integrity check and has the users table."""
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            ok = conn.execute('PRAGMA integrity_check').fetchone()[0] == "ok"
+            has_users = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users'").fetchone()
+            return ok and has_users is not None
+        finally:
+            conn.close()
+    except sqlite3.Error as ex:
+        log_backup(f"Verify failed for {path}: {ex}")
+        return False
+
+def prune_backups(keep=BACKUP_KEEP, backup_dir=None):
+    """Delete all but the newest `keep` snapshots. Returns the removed paths."""
+    removed = []
+    for path in list_backups(backup_dir)[keep:]:
+        try:
+            os.remove(path)
+            removed.append(path)
+        except OSError as ex:
+            log_backup(f"Could not remove {path}: {ex}")
+    return removed
+
+def _claim_snapshot_path(backup_dir):
+    """Create an empty file under a new snapshot name and return its path.
+
+    The name has microseconds, and O_EXCL (with a counter on a clash) makes
+    sure two backups in the same instant, e.g. the scheduler and
+    `cli.py backup create`, never share a path.
+    """
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    n = 0
+    while True:
+        suffix = f"-{n}" if n else ""
+        path = os.path.join(backup_dir, f"{SNAPSHOT_PREFIX}{stamp}{suffix}{SNAPSHOT_SUFFIX}")
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return path
+        except FileExistsError:
+            n += 1
+
+def create_backup(backup_dir=None, keep=BACKUP_KEEP, progress=None):
+    """Take an online snapshot of the live database and rotate old ones.
+
+    The copy is written to a temp name and only renamed once it verifies,
+    so a crash mid-backup never leaves a torn snapshot in the rotation.
+    """
+    backup_dir = backup_dir or get_backup_dir()
+    path = _claim_snapshot_path(backup_dir)
+    tmp_path = path + ".part"
+
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        _copy(get_db_path(), tmp_path, progress)
+        if not verify_backup(tmp_path):
+            os.remove(tmp_path)
+            raise RuntimeError("Backup failed verification")
+    except Exception:
+        os.remove(path)
+        raise
+    os.replace(tmp_path, path)
+    log_backup(f"Snapshot written: {path} ({os.path.getsize(path)} bytes)")
+
+    for old in prune_backups(keep, backup_dir):
+        log_backup(f"Rotated out {old}")
+    return path
+
+def restore_backup(snapshot_path, progress=None):
+    """Verify a snapshot and copy it over the live database.
+
+    The restore goes through the backup API as well, so open connections
+    see the restored content instead of a replaced file underneath them.
+    """
+    if not verify_backup(snapshot_path):
+        raise ValueError(f"{snapshot_path} is not a valid backup")
+    _copy(snapshot_path, get_db_path(), progress)
+    log_backup(f"Restored from {snapshot_path}")
+
+# --- Scheduler ---
+_scheduler = {"timer": None}
+
+def start_backup_scheduler(interval=AUTO_BACKUP_INTERVAL, keep=BACKUP_KEEP):
+    """Take a backup every `interval` seconds on a daemon thread."""
+    def run():
+        try:
+            create_backup(keep=keep)
+        except Exception as ex:
+            log_backup(f"Scheduled backup failed: {ex}")
+        schedule()
+
+    def schedule(delay=interval):
+        t = threading.Timer(delay, run)
+        t.daemon = True
+        _scheduler["timer"] = t
+        t.start()
+
+    # Short sessions (mobile) rarely live a full interval, so the first run is
+    # due when the newest snapshot is older than the interval
+    first_delay = 0
+    existing = list_backups()
+    if existing:
+        age = datetime.datetime.now().timestamp() - os.path.getmtime(existing[0])
+        first_delay = max(0, interval - age)
+
+    stop_backup_scheduler()
+    schedule(first_delay)
+    log_backup(f"Scheduler started (every {interval}s, keep {keep}, first in {int(first_delay)}s)")
+
+def stop_backup_scheduler():
+    t = _scheduler["timer"]
+    if t:
+        t.cancel()
+        _scheduler["timer"] = None
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Back up or restore the vocabulary database")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_create = sub.add_parser("create")
+    p_create.add_argument("--keep", type=int, default=BACKUP_KEEP)
+    sub.add_parser("list")
+    p_restore = sub.add_parser("restore")
+    p_restore.add_argument("snapshot")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        print(create_backup(keep=args.keep))
+    elif args.command == "list":
+        for path in list_backups():
+            print(path)
+    elif args.command == "restore":
+        restore_backup(args.snapshot)
+        print(f"Restored {args.snapshot}")
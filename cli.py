@@ -0,0 +1,182 @@
+# Headless admin commands (python cli.py <command> --help). Uses the same
+# data layer as the app but never imports flet, so it runs on servers and
+# in build pipelines.
+import os
+import sys
+import time
+import argparse
+import database
+
+def cmd_seed(args):
+    from seed_data import seed_data
+    seed_data()
+    print("Seed complete.")
+
+def cmd_import(args):
+    from importers import import_words
+    count = import_words(args.file, args.level, args.format)
+    print(f"Imported {count} words into level {args.level}")
+
+def cmd_export(args):
+    from exporters import export_dataset
+    filters = {"level": args.level}
+    if args.username:
+        filters["username"] = args.username
+    count = export_dataset(args.dataset, args.out, args.format, **filters)
+    print(f"Exported {count} rows to {args.out}")
+
+def cmd_build_vocab(args):
+    from vocab_pack import build_vocab_db
+    count = build_vocab_db(args.out, args.pack or None)
+    print(f"Wrote {count} words to {args.out}")
+
+def cmd_stats(args):
+    conn = database.get_db_connection()
+    try:
+        print(f"Database: {database.get_db_path()} ({os.path.getsize(database.get_db_path()) / 1024 / 1024:.1f} MB)")
+        shared, shipped, copied = database.vocab_status(conn)
+        if shared:
+            print(f"Vocabulary: {database.get_vocab_path()} (shared, read-only, build {shipped or 'unrecorded'})")
+        else:
+            print(f"Vocabulary: local copy (from {copied or 'packs'}; shipped file {database.get_vocab_path()} is build {shipped or 'unrecorded'})")
+            if shipped and copied and copied != shipped:
+                print("  WARNING: the local copy shadows a newer shipped vocabulary; restart the app to merge its new words")
+        print(f"Schema version: {conn.execute('PRAGMA user_version').fetchone()[0]}")
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        print(f"Free pages: {free} ({free * page_size / 1024:.0f} KB)")
+        for table in ("users", "words", "level_progress", "word_errors", "attempts", "attempts_compacted"):
+            print(f"{table}: {conn.execute(f'SELECT count(*) FROM {table}').fetchone()[0]}")
+        for level, count in conn.execute('SELECT level, count(*) FROM words GROUP BY level ORDER BY level'):
+            print(f"  level {level}: {count} words")
+    finally:
+        conn.close()
+
+def cmd_vacuum(args):
+    before = os.path.getsize(database.get_db_path())
+    conn = database.get_db_connection()
+    # The rebuild also switches older files to incremental auto-vacuum
+    conn.execute('PRAGMA main.auto_vacuum = INCREMENTAL')
+    conn.execute('VACUUM main')
+    if args.analyze:
+        conn.execute('ANALYZE main')
+    conn.close()
+    after = os.path.getsize(database.get_db_path())
+    print(f"VACUUM{' + ANALYZE' if args.analyze else ''}: {before} -> {after} bytes")
+
+def cmd_analyze(args):
+    conn = database.get_db_connection()
+    conn.execute('ANALYZE main')
+    conn.close()
+    print("ANALYZE complete.")
+
+def cmd_backup(args):
+    import backup
+    if args.action == "create":
+        print(backup.create_backup(keep=args.keep))
+    elif args.action == "list":
+        for path in backup.list_backups():
+            print(path)
+    elif args.action == "restore":
+        if not args.snapshot:
+            sys.exit("restore needs a snapshot path")
+        backup.restore_backup(args.snapshot)
+        print(f"Restored {args.snapshot}")
+
+def _time_ms(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[-1]
+
+def cmd_benchmark(args):
+    """Median/max timings of the queries the views run most."""
+    import leaderboard
+    user_id = database.get_user_id(args.username) if args.username else None
+    if user_id is None:
+        row = database.get_top_users(1)
+        user_id = row[0]['id'] if row else 0
+    level = args.level
+    cases = [
+        ("count_words_in_level", lambda: database.count_words_in_level(level)),
+        ("get_words_page", lambda: database.get_words_page(level, 50)),
+        ("get_words_by_level", lambda: database.get_words_by_level(level)),
+        ("count_difficult_words", lambda: database.count_difficult_words(user_id)),
+        ("get_difficult_words_page", lambda: database.get_difficult_words_page(user_id, database.DIFFICULT_MIN_ERRORS)),
+        ("get_top_users", lambda: database.get_top_users(leaderboard.TOP_LIMIT)),
+        ("get_user_rank", lambda: database.get_user_rank(user_id)),
+    ]
+    print(f"{'query':28} {'median ms':>10} {'max ms':>10}")
+    for name, func in cases:
+        median, worst = _time_ms(func, args.repeat)
+        print(f"{name:28} {median:10.2f} {worst:10.2f}")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="English Mastery admin tools (no UI)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("seed", help="create tables and install bundled word packs")
+    p.set_defaults(func=cmd_seed)
+
+    from importers import IMPORT_FORMATS
+    p = sub.add_parser("import", help="import words from an .xlsx or .csv file")
+    p.add_argument("file")
+    p.add_argument("--level", type=int, required=True, choices=range(1, 7))
+    p.add_argument("--format", choices=IMPORT_FORMATS, help="defaults to the file extension")
+    p.set_defaults(func=cmd_import)
+
+    from exporters import DATASETS, EXPORT_FORMATS
+    p = sub.add_parser("export", help="export words, progress or errors")
+    p.add_argument("dataset", choices=sorted(DATASETS))
+    p.add_argument("out", help="output file (.csv, .jsonl or .xlsx)")
+    p.add_argument("--format", choices=EXPORT_FORMATS, help="defaults to the output file extension")
+    p.add_argument("--level", type=int)
+    p.add_argument("--username")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("build-vocab", help="build a shippable read-only vocabulary database from packs")
+    p.add_argument("out")
+    p.add_argument("--pack", action="append", help="pack file(s) to include (default: packs/*.pack.gz)")
+    # Works on packs only; doesn't open (or create) the progress database
+    p.set_defaults(func=cmd_build_vocab, init_db=False)
+
+    p = sub.add_parser("stats", help="table sizes and free space")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("vacuum", help="rebuild the database file to reclaim free space")
+    p.add_argument("--analyze", action="store_true", help="refresh planner statistics afterwards")
+    p.set_defaults(func=cmd_vacuum)
+
+    p = sub.add_parser("analyze", help="refresh query planner statistics")
+    p.set_defaults(func=cmd_analyze)
+
+    from backup import BACKUP_KEEP
+    p = sub.add_parser("backup", help="create, list or restore snapshots")
+    p.add_argument("action", choices=("create", "list", "restore"))
+    p.add_argument("snapshot", nargs="?", help="snapshot to restore")
+    p.add_argument("--keep", type=int, default=BACKUP_KEEP)
+    p.set_defaults(func=cmd_backup)
+
+    p = sub.add_parser("benchmark", help="time the hot queries")
+    p.add_argument("--level", type=int, default=1)
+    p.add_argument("--username")
+    p.add_argument("--repeat", type=int, default=20)
+    p.set_defaults(func=cmd_benchmark)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not getattr(args, "init_db", True):
+        args.func(args)
+        return
+    # Same schema setup the app does at startup (a no-op when current)
+    database.init_db()
+    args.func(args)
+    import maintenance
+    maintenance.optimize_db()
+
+if __name__ == "__main__":
+    main()
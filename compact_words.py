@@ -0,0 +1,140 @@
+from array import array
+
+class WordRecord:
+    """Lightweight view of one word; supports word['english_word'] like the old dicts."""
+    __slots__ = ("id", "level", "english_word", "arabic_word", "error_count")
+
+    def __init__(self, id, level, english_word, arabic_word, error_count=None):
+        self.id = id
+        self.level = level
+        self.english_word = english_word
+        self.arabic_word = arabic_word
+        self.error_count = error_count
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __repr__(self):
+        return f"WordRecord(id={self.id}, level={self.level}, english_word={self.english_word!r})"
+
+
+class StringColumn:
+    """Strings packed back to back as UTF-8 in one bytearray, with end offsets.
+
+    Costs the encoded bytes plus 4 bytes per string, instead of a full str
+    object (~50+ bytes of overhead) per value.
+    """
+    __slots__ = ("data", "ends")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.ends = array("I")
+
+    def append(self, value):
+        self.data += value.encode("utf-8")
+        self.ends.append(len(self.data))
+
+    def extend(self, other):
+        base = len(self.data)
+        self.data += other.data
+        self.ends.extend(end + base for end in other.ends)
+
+    def drop_front(self, n):
+        if n <= 0:
+            return
+        cut = self.ends[n - 1] if n <= len(self.ends) else len(self.data)
+        del self.data[:cut]
+        del self.ends[:n]
+        for i in range(len(self.ends)):
+            self.ends[i] -= cut
+
+    def __len__(self):
+        return len(self.ends)
+
+    def __getitem__(self, i):
+        start = self.ends[i - 1] if i > 0 else 0
+        return self.data[start:self.ends[i]].decode("utf-8")
+
+
+class WordBlock:
+    """Column-oriented container for a list of words.
+
+    ids/levels (and error counts for difficult words) live in typed arrays and
+    the strings in two StringColumns, instead of one dict per word. Indexing
+    returns a WordRecord built on demand.
+    """
+    __slots__ = ("ids", "levels", "english", "arabic", "error_counts")
+
+    def __init__(self, with_errors=False):
+        self.ids = array("q")
+        self.levels = array("i")
+        self.english = StringColumn()
+        self.arabic = StringColumn()
+        self.error_counts = array("l") if with_errors else None
+
+    @classmethod
+    def from_rows(cls, rows, with_errors=False):
+        """Build from (id, level, english_word, arabic_word[, error_count]) tuples."""
+        block = cls(with_errors)
+        for row in rows:
+            block.ids.append(row[0])
+            block.levels.append(row[1])
+            block.english.append(row[2])
+            block.arabic.append(row[3])
+            if with_errors:
+                block.error_counts.append(row[4])
+        return block
+
+    def append(self, id, level, english_word, arabic_word, error_count=None):
+        self.ids.append(id)
+        self.levels.append(level)
+        self.english.append(english_word)
+        self.arabic.append(arabic_word)
+        if self.error_counts is not None:
+            self.error_counts.append(error_count or 0)
+
+    def extend(self, other):
+        self.ids.extend(other.ids)
+        self.levels.extend(other.levels)
+        self.english.extend(other.english)
+        self.arabic.extend(other.arabic)
+        if self.error_counts is not None:
+            self.error_counts.extend(other.error_counts)
+
+    def drop_front(self, n):
+        """Remove the first n words."""
+        del self.ids[:n]
+        del self.levels[:n]
+        self.english.drop_front(n)
+        self.arabic.drop_front(n)
+        if self.error_counts is not None:
+            del self.error_counts[:n]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __bool__(self):
+        return len(self.ids) > 0
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self.ids)
+        if not 0 <= i < len(self.ids):
+            raise IndexError("word index out of range")
+        return WordRecord(
+            self.ids[i],
+            self.levels[i],
+            self.english[i],
+            self.arabic[i],
+            self.error_counts[i] if self.error_counts is not None else None,
+        )
+
+    def __iter__(self):
+        for i in range(len(self.ids)):
+            yield self[i]
@@ -0,0 +1,165 @@
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from database import get_db_connection, make_words_writable
+
+# Corpus is read in chunks of this many bytes, cut at the last newline
+CHUNK_BYTES = 8 * 1024 * 1024
+# Chunks in flight per worker; caps memory at roughly workers * this * CHUNK_BYTES
+CHUNKS_PER_WORKER = 2
+# Words per level by frequency rank: ranks 1-1000 -> level 1, ... Bands widen
+# when needed so MAX_LEVEL of them cover the vocabulary (the last level never
+# takes all the remaining words)
+LEVEL_BAND_SIZE = 1000
+MAX_LEVEL = 6
+
+TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+def log_ranker(msg):
+    try:
+        import datetime
+        log_file = os.path.join(os.path.expanduser("~"), "english_mastery_debug.log")
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(f"[{timestamp}] [RANKER] {msg}\n")
+    except: pass
+
+# --- Worker side ---
+_vocab = None
+
+def _init_worker(vocab):
+    global _vocab
+    _vocab = vocab
+
+def _count_chunk(chunk):
+    """Count vocabulary tokens in one chunk; only vocabulary words are kept, so the Counter stays small."""
+    counts = Counter()
+    vocab = _vocab
+    for token in TOKEN_RE.findall(chunk.decode("utf-8", errors="ignore").lower()):
+        if token in vocab:
+            counts[token] += 1
+    return counts
+
+# --- Driver side ---
+def iter_chunks(paths, chunk_bytes=CHUNK_BYTES):
+    """Yield byte chunks from the corpus files, never splitting a line."""
+    for path in paths:
+        with open(path, "rb") as f:
+            tail = b""
+            while True:
+                block = f.read(chunk_bytes)
+                if not block:
+                    break
+                block = tail + block
+                cut = block.rfind(b"\n")
+                if cut == -1:
+                    if len(block) < chunk_bytes:
+                        tail = block
+                        continue
+                    # A line longer than a chunk: cut at a space (or anywhere) so tail stays bounded
+                    cut = block.rfind(b" ")
+                    if cut == -1:
+                        cut = len(block) - 1
+                tail = block[cut + 1:]
+                yield block[:cut + 1]
+            if tail:
+                yield tail
+
+def load_vocabulary():
+    """(id, english_word) for every word, in id order."""
+    conn = get_db_connection()
+    rows = [(r[0], r[1]) for r in conn.execute('SELECT id, english_word FROM words ORDER BY id')]
+    conn.close()
+    return rows
+
+def vocabulary_tokens(words):
+    tokens = set()
+    for _, english in words:
+        tokens.update(TOKEN_RE.findall(english.lower()))
+    return frozenset(tokens)
+
+def count_corpus(paths, vocab, workers=None, chunk_bytes=CHUNK_BYTES):
+    """Token counts for `vocab` over the corpus, counted in parallel with bounded in-flight chunks."""
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * CHUNKS_PER_WORKER
+    totals = Counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(vocab,)) as pool:
+        pending = set()
+        for chunk in iter_chunks(paths, chunk_bytes):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    totals.update(fut.result())
+            pending.add(pool.submit(_count_chunk, chunk))
+        for fut in pending:
+            totals.update(fut.result())
+    return totals
+
+def word_frequency(english, counts):
+    """Corpus frequency of a vocabulary entry; a phrase is as common as its rarest word."""
+    tokens = TOKEN_RE.findall(english.lower())
+    if not tokens:
+        return 0
+    return min(counts.get(t, 0) for t in tokens)
+
+def assign_levels(words, counts, band_size=LEVEL_BAND_SIZE, max_level=MAX_LEVEL):
+    """[(level, id)] by frequency rank; ties keep the existing id order."""
+    ranked = sorted(words, key=lambda w: -word_frequency(w[1], counts))
+    band_size = max(band_size, -(-len(ranked) // max_level))
+    return [(min(rank // band_size + 1, max_level), word_id) for rank, (word_id, _) in enumerate(ranked)]
+
+def apply_levels(assignments):
+    """Rewrite words.level for all assignments in a single transaction. Returns rows changed."""
+    conn = get_db_connection()
+    try:
+        make_words_writable(conn)
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS new_levels (id INTEGER PRIMARY KEY, level INTEGER NOT NULL)')
+        conn.execute('DELETE FROM new_levels')
+        conn.executemany('INSERT INTO new_levels (level, id) VALUES (?, ?)', assignments)
+        cur = conn.execute('''UPDATE words SET level = n.level
+                              FROM new_levels n
+                              WHERE words.id = n.id AND words.level != n.level''')
+        conn.execute('DROP TABLE new_levels')
+        conn.commit()
+        return cur.rowcount
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def rank_corpus(paths, workers=None, band_size=LEVEL_BAND_SIZE, dry_run=False):
+    """Count the corpus, rank the vocabulary and reassign levels. Returns a summary dict."""
+    started = time.perf_counter()
+    words = load_vocabulary()
+    counts = count_corpus(paths, vocabulary_tokens(words), workers)
+    assignments = assign_levels(words, counts, band_size)
+    bands = Counter(level for level, _ in assignments)
+    changed = 0 if dry_run else apply_levels(assignments)
+    if changed:
+        import events
+        events.publish(events.Event(events.WORD_UPDATED))
+        from maintenance import after_bulk_change
+        after_bulk_change(changed)
+    summary = {
+        "words": len(words),
+        "tokens_counted": sum(counts.values()),
+        "unseen": sum(1 for _, english in words if not word_frequency(english, counts)),
+        "levels": dict(sorted(bands.items())),
+        "changed": changed,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+    log_ranker(f"Ranked corpus {paths}: {summary}")
+    return summary
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Reassign word levels by frequency in a text corpus")
+    parser.add_argument("corpus", nargs="+", help="plain-text corpus file(s)")
+    parser.add_argument("--workers", type=int, help="counting processes (default: CPU count)")
+    parser.add_argument("--band-size", type=int, default=LEVEL_BAND_SIZE, help="minimum words per level by rank")
+    parser.add_argument("--dry-run", action="store_true", help="show the new level sizes without writing")
+    args = parser.parse_args()
+    print(rank_corpus(args.corpus, args.workers, args.band_size, args.dry_run))
@@ -1,246 +1,858 @@
-import sqlite3
-import os
-
-DB_NAME = "vocabulary.db"
-
-import sys
-
-def get_db_path():
-    # Use a safe fallback for the log
-    log_file = os.path.join(os.path.expanduser("~"), "english_mastery_debug.log")
-    def debug_log(msg):
-        try:
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(f"[DB_PATH_LOG] {msg}\n")
-        except: pass
-
-    try:
-        # Detect Android
-        is_android = os.environ.get("ANDROID_ARGUMENT") or os.environ.get("ANDROID_BOOTLOGO")
-        
-        if is_android:
-            debug_log("Android detected")
-            base_path = os.environ.get("FILES_DIR", os.path.expanduser("~"))
-        elif getattr(sys, 'frozen', False):
-            debug_log("Frozen (executable) detected")
-            base_path = os.path.dirname(sys.executable)
-            
-            # Ultra-safe check for write permissions
-            test_file = os.path.join(base_path, ".write_test")
-            can_write = False
-            try:
-                with open(test_file, "w") as f: f.write("test")
-                os.remove(test_file)
-                can_write = True
-            except:
-                debug_log("Program folder is READ-ONLY")
-
-            if not can_write:
-                app_data = os.getenv('APPDATA')
-                if not app_data:
-                    app_data = os.path.expanduser('~')
-                base_path = os.path.join(app_data, 'EnglishMasteryApp')
-                if not os.path.exists(base_path):
-                    os.makedirs(base_path)
-                debug_log(f"Using APPDATA fallback: {base_path}")
-        else:
-            debug_log("Source mode detected")
-            base_path = os.path.dirname(os.path.abspath(__file__))
-            
-        final_path = os.path.join(base_path, DB_NAME)
-        debug_log(f"Final Path: {final_path}")
-        return final_path
-    except Exception as e:
-        debug_log(f"CRITICAL ERROR in get_db_path: {str(e)}")
-        # Ultimate fallback
-        return os.path.join(os.path.expanduser("~"), DB_NAME)
-
-def get_db_connection():
-    db_path = get_db_path()
-    conn = sqlite3.connect(db_path, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def init_db():
-    conn = get_db_connection()
-    c = conn.cursor()
-    
-    # Users table
-    # current_level: 1-6
-    # current_word_index: Index of the word the user is currently on in that level
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    current_level INTEGER DEFAULT 1,
-                    current_word_index INTEGER DEFAULT 0,
-                    score INTEGER DEFAULT 0
-                )''')
-
-    # Words table
-    c.execute('''CREATE TABLE IF NOT EXISTS words (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    level INTEGER NOT NULL,
-                    english_word TEXT NOT NULL,
-                    arabic_word TEXT NOT NULL,
-                    audio_path TEXT
-                )''')
-    
-    # Per-level progress table
-    c.execute('''CREATE TABLE IF NOT EXISTS level_progress (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT NOT NULL,
-                    level INTEGER NOT NULL,
-                    word_index INTEGER DEFAULT 0,
-                    UNIQUE(username, level)
-                )''')
-
-    # Word errors table - tracks wrong attempts
-    c.execute('''CREATE TABLE IF NOT EXISTS word_errors (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT NOT NULL,
-                    word_id INTEGER NOT NULL,
-                    error_count INTEGER DEFAULT 0,
-                    UNIQUE(username, word_id)
-                )''')
-
-    conn.commit()
-    conn.close()
-
-def get_user(username):
-    conn = get_db_connection()
-    user = conn.execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
-    conn.close()
-    return user
-
-def create_user(username):
-    conn = get_db_connection()
-    try:
-        cur = conn.cursor()
-        cur.execute('INSERT INTO users (username) VALUES (?)', (username,))
-        conn.commit()
-        user_id = cur.lastrowid
-        user = conn.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
-        conn.close()
-        return user
-    except sqlite3.IntegrityError:
-        conn.close()
-        return get_user(username)
-
-def get_words_by_level(level):
-    conn = get_db_connection()
-    words = conn.execute('SELECT * FROM words WHERE level = ? ORDER BY id', (level,)).fetchall()
-    conn.close()
-    return [dict(w) for w in words]
-
-def update_user_progress(username, level, index, score_increment=0):
-    conn = get_db_connection()
-    conn.execute('''UPDATE users 
-                    SET current_level = ?, current_word_index = ?, score = score + ? 
-                    WHERE username = ?''', 
-                 (level, index, score_increment, username))
-    conn.commit()
-    conn.close()
-
-def reset_user_progress_for_level(username, level):
-    conn = get_db_connection()
-    conn.execute('UPDATE users SET current_level = ? WHERE username = ?', (level, username))
-    # Reset per-level progress
-    conn.execute('INSERT OR REPLACE INTO level_progress (username, level, word_index) VALUES (?, ?, 0)', (username, level))
-    conn.commit()
-    conn.close()
-
-def get_level_progress(username, level):
-    """Get the saved word index for a specific level."""
-    conn = get_db_connection()
-    row = conn.execute('SELECT word_index FROM level_progress WHERE username = ? AND level = ?', (username, level)).fetchone()
-    conn.close()
-    return row['word_index'] if row else 0
-
-def set_level_progress(username, level, word_index):
-    """Save word index for a specific level."""
-    conn = get_db_connection()
-    conn.execute('INSERT OR REPLACE INTO level_progress (username, level, word_index) VALUES (?, ?, ?)', (username, level, word_index))
-    conn.commit()
-    conn.close()
-
-def delete_word(word_id):
-    conn = get_db_connection()
-    conn.execute('DELETE FROM words WHERE id = ?', (word_id,))
-    conn.commit()
-    conn.close()
-
-def delete_words_bulk(word_ids):
-    if not word_ids:
-        return
-    conn = get_db_connection()
-    placeholders = ','.join('?' for _ in word_ids)
-    conn.execute(f'DELETE FROM words WHERE id IN ({placeholders})', word_ids)
-    conn.commit()
-    conn.close()
-
-def update_word(word_id, english_word, arabic_word):
-    conn = get_db_connection()
-    conn.execute('UPDATE words SET english_word = ?, arabic_word = ? WHERE id = ?', 
-                 (english_word, arabic_word, word_id))
-    conn.commit()
-    conn.close()
-
-def get_word_count_by_level():
-    conn = get_db_connection()
-    rows = conn.execute('SELECT level, count(*) as cnt FROM words GROUP BY level ORDER BY level').fetchall()
-    conn.close()
-    return {r['level']: r['cnt'] for r in rows}
-
-def increment_word_error(username, word_id):
-    """Increment error count for a word."""
-    conn = get_db_connection()
-    conn.execute('''INSERT INTO word_errors (username, word_id, error_count) 
-                    VALUES (?, ?, 1)
-                    ON CONFLICT(username, word_id) 
-                    DO UPDATE SET error_count = error_count + 1''', (username, word_id))
-    conn.commit()
-    conn.close()
-
-def get_difficult_words(username, min_errors=3):
-    """Get words where user made errors >= min_errors."""
-    conn = get_db_connection()
-    rows = conn.execute('''SELECT w.id, w.level, w.english_word, w.arabic_word, we.error_count
-                           FROM word_errors we
-                           JOIN words w ON we.word_id = w.id
-                           WHERE we.username = ? AND we.error_count >= ?
-                           ORDER BY we.error_count DESC''', (username, min_errors)).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
-
-def remove_from_difficult(username, word_id):
-    """Remove a word from difficult list (reset error count)."""
-    conn = get_db_connection()
-    conn.execute('DELETE FROM word_errors WHERE username = ? AND word_id = ?', (username, word_id))
-    conn.commit()
-    conn.close()
-
-def get_last_user():
-    """Load last username from file for auto-login."""
-    try:
-        path = os.path.join(os.path.dirname(get_db_path()), "last_user.txt")
-        if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                return f.read().strip()
-    except: pass
-    return None
-
-def set_last_user(username):
-    """Save last username for auto-login."""
-    try:
-        path = os.path.join(os.path.dirname(get_db_path()), "last_user.txt")
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(username)
-    except: pass
-
-def clear_last_user():
-    """Clear saved username on logout."""
-    try:
-        path = os.path.join(os.path.dirname(get_db_path()), "last_user.txt")
-        if os.path.exists(path):
-            os.remove(path)
-    except: pass
+import sqlite3
+import os
+import json
+from array import array
+import pathlib
+from compact_words import WordBlock
+import events
+from events import Event, publish
+
+# Shared word list shipped with the app; opened read-only and immutable
+VOCAB_DB_NAME = "vocabulary.db"
+# Per-install writable database: users, progress, errors, attempts, meta
+DB_NAME = "progress.db"
+
+# Words added on this install (imports, edits of a local copy) get ids from
+# here up, so they never collide with the permanent ids of pack words
+LOCAL_WORD_ID_BASE = 1_000_000_000
+
+# Bump when init_db() gains new tables/indexes; stored in PRAGMA user_version
+SCHEMA_VERSION = 11
+
+import sys
+
+def log_db(msg):
+    log_file = os.path.join(os.path.expanduser("~"), "english_mastery_debug.log")
+    try:
+        import datetime
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(f"[{timestamp}] [DATABASE] {msg}\n")
+    except: pass
+
+# Resolved once per process; get_db_path() probes the filesystem and writes a log line
+_DB_PATH = None
+
+def get_db_path():
+    global _DB_PATH
+    if _DB_PATH:
+        return _DB_PATH
+
+    # Use a safe fallback for the log
+    log_file = os.path.join(os.path.expanduser("~"), "english_mastery_debug.log")
+    def debug_log(msg):
+        try:
+            with open(log_file, "a", encoding="utf-8") as f:
+                f.write(f"[DB_PATH_LOG] {msg}\n")
+        except: pass
+
+    try:
+        # Detect Android
+        is_android = os.environ.get("ANDROID_ARGUMENT") or os.environ.get("ANDROID_BOOTLOGO")
+        
+        if is_android:
+            debug_log("Android detected")
+            base_path = os.environ.get("FILES_DIR", os.path.expanduser("~"))
+        elif getattr(sys, 'frozen', False):
+            debug_log("Frozen (executable) detected")
+            base_path = os.path.dirname(sys.executable)
+            
+            # Ultra-safe check for write permissions
+            test_file = os.path.join(base_path, ".write_test")
+            can_write = False
+            try:
+                with open(test_file, "w") as f: f.write("test")
+                os.remove(test_file)
+                can_write = True
+            except:
+                debug_log("Program folder is READ-ONLY")
+
+            if not can_write:
+                app_data = os.getenv('APPDATA')
+                if not app_data:
+                    app_data = os.path.expanduser('~')
+                base_path = os.path.join(app_data, 'EnglishMasteryApp')
+                if not os.path.exists(base_path):
+                    os.makedirs(base_path)
+                debug_log(f"Using APPDATA fallback: {base_path}")
+        else:
+            debug_log("Source mode detected")
+            base_path = os.path.dirname(os.path.abspath(__file__))
+            
+        final_path = os.path.join(base_path, DB_NAME)
+        debug_log(f"Final Path: {final_path}")
+        _DB_PATH = final_path
+        return final_path
+    except Exception as e:
+        debug_log(f"CRITICAL ERROR in get_db_path: {str(e)}")
+        # Ultimate fallback
+        return os.path.join(os.path.expanduser("~"), DB_NAME)
+
+def get_vocab_path():
+    """Path of the shipped vocabulary database (next to the app, may be read-only)."""
+    if getattr(sys, 'frozen', False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_path, VOCAB_DB_NAME)
+
+def _legacy_db_path():
+    """Where older versions kept the single combined database (users and words together)."""
+    return os.path.join(os.path.dirname(get_db_path()), VOCAB_DB_NAME)
+
+def get_db_connection():
+    db_path = get_db_path()
+    conn = sqlite3.connect(pathlib.Path(db_path).as_uri(), uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # Enforce ON DELETE CASCADE (off by default, per connection)
+    conn.execute('PRAGMA foreign_keys = ON')
+    # The shipped vocabulary is attached immutable: no locking or change
+    # detection on reads. Unqualified "words" resolves to it unless this
+    # install has its own editable copy in main (see make_words_writable)
+    vocab_path = get_vocab_path()
+    if os.path.exists(vocab_path):
+        conn.execute("ATTACH DATABASE ? AS vocab", (pathlib.Path(vocab_path).as_uri() + "?mode=ro&immutable=1",))
+    return conn
+
+def _has_table(conn, table, schema="main"):
+    return conn.execute(f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone() is not None
+
+def _vocab_attached(conn):
+    return any(row[1] == "vocab" for row in conn.execute('PRAGMA database_list'))
+
+def words_are_shared(conn=None):
+    """True while words are served straight from the immutable vocabulary file."""
+    own = conn is None
+    conn = conn or get_db_connection()
+    try:
+        return _vocab_attached(conn) and not _has_table(conn, "words")
+    finally:
+        if own:
+            conn.close()
+
+def make_words_writable(conn):
+    """Copy-on-first-write: give this install its own editable copy of the word list.
+
+    The immutable vocabulary can't be changed in place, so the first edit,
+    delete or import copies its words (ids preserved) into the progress
+    database, where they shadow the shared file from then on.
+    """
+    if not words_are_shared(conn):
+        return False
+    conn.execute(WORDS_SQL.replace("words", "main.words", 1))
+    conn.execute('INSERT INTO main.words (id, level, english_word, arabic_word, audio_path) SELECT id, level, english_word, arabic_word, audio_path FROM vocab.words')
+    conn.execute('CREATE INDEX IF NOT EXISTS main.idx_words_level ON words(level, id)')
+    reserve_local_word_ids(conn)
+    # Remember what was copied, so a newer shipped file can be merged in (see _reconcile_local_words)
+    _set_words_copied_from(conn, _vocab_build(conn), conn.execute('SELECT max(id) FROM vocab.words').fetchone()[0])
+    conn.commit()
+    return True
+
+def reserve_local_word_ids(conn):
+    """Make the next locally added word get an id above LOCAL_WORD_ID_BASE."""
+    if not _has_table(conn, "sqlite_sequence"):
+        return
+    conn.execute("UPDATE main.sqlite_sequence SET seq = max(seq, ?) WHERE name = 'words'", (LOCAL_WORD_ID_BASE,))
+    conn.execute('''INSERT INTO main.sqlite_sequence (name, seq) SELECT 'words', ?
+                    WHERE NOT EXISTS (SELECT 1 FROM main.sqlite_sequence WHERE name = 'words')''', (LOCAL_WORD_ID_BASE,))
+
+def _vocab_build(conn):
+    """Build string of the attached vocabulary file (None for files built before builds were recorded)."""
+    if not _vocab_attached(conn) or not _has_table(conn, "meta", "vocab"):
+        return None
+    row = conn.execute("SELECT value FROM vocab.meta WHERE key = 'vocab_build'").fetchone()
+    return row[0] if row else None
+
+def _set_words_copied_from(conn, build, max_id):
+    conn.execute('CREATE TABLE IF NOT EXISTS main.meta (key TEXT PRIMARY KEY, value TEXT)')
+    conn.executemany('INSERT OR REPLACE INTO main.meta (key, value) VALUES (?, ?)',
+                     [("words_copied_from", build or "unknown"), ("words_copied_max_id", str(max_id or 0))])
+
+def _meta_value(conn, key):
+    row = conn.execute('SELECT value FROM main.meta WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else None
+
+def vocab_status(conn):
+    """(shared, shipped build, build the local copy was taken from) for diagnostics."""
+    shared = words_are_shared(conn)
+    copied = None if shared or not _has_table(conn, "meta") else _meta_value(conn, "words_copied_from")
+    return shared, _vocab_build(conn), copied
+
+def _reconcile_local_words(conn):
+    """Merge a newly shipped vocabulary file into this install's own copy of the words.
+
+    A local copy shadows the shipped file, so without this a new word list
+    would be silently ignored. Pack ids are permanent: words with ids above
+    the highest id at copy time are new and are added; lower ids missing
+    locally were deleted here and stay deleted. Local edits win over text
+    changes in the new file. Returns the number of words added, or None.
+    """
+    shipped = _vocab_build(conn)
+    if shipped is None or not _has_table(conn, "words") or not _has_table(conn, "meta"):
+        return None
+    copied = _meta_value(conn, "words_copied_from")
+    if copied == shipped:
+        return None
+    max_id = int(_meta_value(conn, "words_copied_max_id") or 0)
+    cur = conn.execute('''INSERT INTO main.words (id, level, english_word, arabic_word, audio_path)
+                          SELECT id, level, english_word, arabic_word, audio_path FROM vocab.words
+                          WHERE id > ? AND id NOT IN (SELECT id FROM main.words)''', (max_id,))
+    _set_words_copied_from(conn, shipped, max(max_id, conn.execute('SELECT max(id) FROM vocab.words').fetchone()[0] or 0))
+    conn.commit()
+    log_db(f"Local word copy (from {copied}) merged {cur.rowcount} new words from shipped vocabulary {shipped}; "
+            "text changes to existing words in the new file are not applied to the local copy")
+    return cur.rowcount
+
+def _migrate_legacy_db():
+    """First run after the split: seed progress.db from the old combined database.
+
+    The old file is copied whole (so init_db's usual migrations apply to it);
+    its words are kept as a local copy only when it isn't the shipped
+    vocabulary file itself, so earlier edits and imports survive.
+    """
+    db_path, legacy_path = get_db_path(), _legacy_db_path()
+    if os.path.exists(db_path) or not os.path.exists(legacy_path):
+        return False
+    src = sqlite3.connect(legacy_path)
+    try:
+        if not _has_table(src, "users"):
+            return False
+        dst = sqlite3.connect(db_path)
+        src.backup(dst)
+        dst.close()
+    finally:
+        src.close()
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA foreign_keys = OFF')
+    if not (os.path.exists(get_vocab_path()) and os.path.samefile(legacy_path, get_vocab_path())):
+        # The kept words are this install's own copy: new ids go above the pack
+        # range, and only words newer than these get merged from a shipped file
+        if _has_table(conn, "words"):
+            reserve_local_word_ids(conn)
+            _set_words_copied_from(conn, "legacy", conn.execute('SELECT max(id) FROM words').fetchone()[0])
+    else:
+        # The shipped file is opened immutable and never written at runtime
+        # (it may sit in a read-only install dir); build_vocab_db gives it its
+        # index and planner statistics
+        conn.execute('DROP TABLE IF EXISTS words')
+    conn.commit()
+    conn.close()
+    return True
+
+def _rebuild_table(c, table, create_sql, columns, select_sql=None):
+    """Recreate a table from a new definition keeping its rows (SQLite can't ALTER constraints).
+
+    select_sql produces the rows for the new table; defaults to copying `columns` as-is.
+    """
+    c.execute(create_sql.replace(table, f"{table}_new", 1))
+    select_sql = select_sql or f'SELECT {columns} FROM {table}'
+    c.execute(f'INSERT INTO {table}_new ({columns}) {select_sql}')
+    c.execute(f'DROP TABLE {table}')
+    c.execute(f'ALTER TABLE {table}_new RENAME TO {table}')
+
+def _table_columns(c, table):
+    return [r[1] for r in c.execute(f'PRAGMA table_info({table})').fetchall()]
+
+# Progress tables key on users.id; usernames are resolved once per session
+LEVEL_PROGRESS_SQL = '''CREATE TABLE IF NOT EXISTS level_progress (
+                    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                    level INTEGER NOT NULL,
+                    word_index INTEGER DEFAULT 0,
+                    shuffle_seed INTEGER,
+                    shuffle_size INTEGER,
+                    PRIMARY KEY(user_id, level)
+                )'''
+
+# word_errors lives in the progress database and words (usually) in the
+# attached vocabulary file; SQLite can't enforce keys across databases, so
+# deleting a word clears its errors explicitly (and GC catches the rest)
+WORD_ERRORS_SQL = '''CREATE TABLE IF NOT EXISTS word_errors (
+                    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                    word_id INTEGER NOT NULL,
+                    error_count INTEGER DEFAULT 0,
+                    PRIMARY KEY(user_id, word_id)
+                )'''
+
+WORDS_SQL = '''CREATE TABLE IF NOT EXISTS words (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    level INTEGER NOT NULL,
+                    english_word TEXT NOT NULL,
+                    arabic_word TEXT NOT NULL,
+                    audio_path TEXT
+                )'''
+
+def init_db():
+    _migrate_legacy_db()
+    conn = get_db_connection()
+    # Fast path: schema already at the current version, skip all DDL
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        _reconcile_local_words(conn)
+        conn.close()
+        return
+
+    # Table rebuilds below must not trigger cascades
+    conn.execute('PRAGMA foreign_keys = OFF')
+    c = conn.cursor()
+    
+    # Users table
+    # current_level: 1-6
+    # current_word_index: Index of the word the user is currently on in that level
+    c.execute('''CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    username TEXT UNIQUE NOT NULL,
+                    current_level INTEGER DEFAULT 1,
+                    current_word_index INTEGER DEFAULT 0,
+                    score INTEGER DEFAULT 0
+                )''')
+
+    # Words table: only created here when there's no shipped vocabulary to attach
+    local_words = not _vocab_attached(conn) or _has_table(conn, "words")
+    if local_words:
+        c.execute(WORDS_SQL)
+    
+    # Per-level progress table
+    c.execute(LEVEL_PROGRESS_SQL)
+
+    # Word errors table - tracks wrong attempts
+    c.execute(WORD_ERRORS_SQL)
+
+    # v4: tables still keyed on username (with or without the v3 foreign keys)
+    # are rebuilt keyed on users.id with ON DELETE CASCADE. Rows of unknown users
+    # are dropped; rows of deleted words are copied as-is and removed afterwards
+    # by maintenance.collect_garbage()
+    orphan_gc_pending = False
+    if "username" in _table_columns(c, "level_progress"):
+        _rebuild_table(c, "level_progress", LEVEL_PROGRESS_SQL, "user_id, level, word_index",
+                       '''SELECT u.id, lp.level, lp.word_index
+                          FROM level_progress lp JOIN users u ON u.username = lp.username''')
+        orphan_gc_pending = True
+    if "username" in _table_columns(c, "word_errors"):
+        _rebuild_table(c, "word_errors", WORD_ERRORS_SQL, "user_id, word_id, error_count",
+                       '''SELECT u.id, we.word_id, we.error_count
+                          FROM word_errors we JOIN users u ON u.username = we.username''')
+        orphan_gc_pending = True
+    # v10: level_progress.shuffle_seed (NULL = study in id order)
+    if "shuffle_seed" not in _table_columns(c, "level_progress"):
+        c.execute('ALTER TABLE level_progress ADD COLUMN shuffle_seed INTEGER')
+    # v11: level_progress.shuffle_size (level size the seed's order was drawn over)
+    if "shuffle_size" not in _table_columns(c, "level_progress"):
+        c.execute('ALTER TABLE level_progress ADD COLUMN shuffle_size INTEGER')
+    # v9: word_errors drops its foreign key to words (now in another database)
+    row = c.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'word_errors'").fetchone()
+    if row and "REFERENCES words" in row[0]:
+        _rebuild_table(c, "word_errors", WORD_ERRORS_SQL, "user_id, word_id, error_count")
+
+    # Covering index for the difficult-words queue: filter by user, walk by
+    # error_count DESC, tie-break and page on word_id without touching the table
+    c.execute('''CREATE INDEX IF NOT EXISTS idx_word_errors_user_errors
+                 ON word_errors(user_id, error_count DESC, word_id)''')
+
+    # Level-ordered walks (paged word loading, per-level counts)
+    if local_words:
+        c.execute('CREATE INDEX IF NOT EXISTS idx_words_level ON words(level, id)')
+
+    # Leaderboard: top-N walks this index, and a rank is a count of the scores above
+    c.execute('CREATE INDEX IF NOT EXISTS idx_users_score ON users(score DESC, id)')
+
+    # Append-only answer log, written in batches by attempt_log.py. No foreign
+    # keys or secondary indexes so inserts stay cheap; id order is time order.
+    c.execute('''CREATE TABLE IF NOT EXISTS attempts (
+                    id INTEGER PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    word_id INTEGER NOT NULL,
+                    correct INTEGER NOT NULL,
+                    latency_ms INTEGER,
+                    ts INTEGER NOT NULL
+                )''')
+
+    # Attempts older than the retention window, folded per user/word/local day
+    c.execute('''CREATE TABLE IF NOT EXISTS attempts_compacted (
+                    user_id INTEGER NOT NULL,
+                    word_id INTEGER NOT NULL,
+                    day TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    correct INTEGER NOT NULL,
+                    latency_ms_sum INTEGER NOT NULL,
+                    PRIMARY KEY(user_id, word_id, day)
+                )''')
+
+    # Daily rollups of attempts, maintained incrementally by analytics.py
+    c.execute('''CREATE TABLE IF NOT EXISTS daily_user_stats (
+                    user_id INTEGER NOT NULL,
+                    day TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    correct INTEGER NOT NULL,
+                    latency_ms_sum INTEGER NOT NULL,
+                    PRIMARY KEY(user_id, day)
+                )''')
+    c.execute('''CREATE TABLE IF NOT EXISTS daily_word_stats (
+                    word_id INTEGER NOT NULL,
+                    day TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    correct INTEGER NOT NULL,
+                    latency_ms_sum INTEGER NOT NULL,
+                    PRIMARY KEY(word_id, day)
+                )''')
+
+    # App metadata (seed/pack markers etc.)
+    c.execute('''CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )''')
+
+    if orphan_gc_pending:
+        c.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('orphan_gc_pending', '1')")
+
+    c.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    conn.commit()
+    _reconcile_local_words(conn)
+    conn.close()
+
+def get_meta(key, default=None):
+    """Read a value from the meta table."""
+    conn = get_db_connection()
+    row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+    conn.close()
+    return row['value'] if row else default
+
+def set_meta(key, value):
+    """Write a value to the meta table."""
+    conn = get_db_connection()
+    conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+    conn.commit()
+    conn.close()
+
+def get_user(username):
+    conn = get_db_connection()
+    user = conn.execute('SELECT * FROM users WHERE username = ?', (username,)).fetchone()
+    conn.close()
+    return user
+
+def create_user(username):
+    conn = get_db_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute('INSERT INTO users (username) VALUES (?)', (username,))
+        conn.commit()
+        user_id = cur.lastrowid
+        user = conn.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+        conn.close()
+        return user
+    except sqlite3.IntegrityError:
+        conn.close()
+        return get_user(username)
+
+WORD_COLUMNS = 'id, level, english_word, arabic_word'
+
+def _fetch_block(conn, sql, params, with_errors=False):
+    """Run a query returning WORD_COLUMNS (+ error_count) into a compact WordBlock."""
+    cur = conn.cursor()
+    cur.row_factory = None  # plain tuples; no per-row Row objects
+    return WordBlock.from_rows(cur.execute(sql, params), with_errors)
+
+def get_words_by_level(level):
+    conn = get_db_connection()
+    words = _fetch_block(conn, f'SELECT {WORD_COLUMNS} FROM words WHERE level = ? ORDER BY id', (level,))
+    conn.close()
+    return words
+
+def get_level_word_ids(level):
+    """Every word id of a level in id order, packed in an array (index-only scan)."""
+    conn = get_db_connection()
+    cur = conn.cursor()
+    cur.row_factory = None
+    ids = array('q', (r[0] for r in cur.execute('SELECT id FROM words WHERE level = ? ORDER BY id', (level,))))
+    conn.close()
+    return ids
+
+def get_words_by_ids(word_ids):
+    """Words for the given ids (any order) in one query."""
+    conn = get_db_connection()
+    words = _fetch_block(conn, f'SELECT {WORD_COLUMNS} FROM words WHERE id IN (SELECT value FROM json_each(?))',
+                         (json.dumps(list(word_ids)),))
+    conn.close()
+    return words
+
+def get_user_id(username):
+    """Resolve a username to users.id (None if unknown). Call once per session."""
+    user = get_user(username)
+    return user['id'] if user else None
+
+def count_words_in_level(level):
+    conn = get_db_connection()
+    row = conn.execute('SELECT count(*) FROM words WHERE level = ?', (level,)).fetchone()
+    conn.close()
+    return row[0]
+
+def get_words_page(level, limit, offset=0, after_id=None):
+    """Get up to `limit` words of a level in id order.
+
+    Pass after_id (the last id already loaded) to continue a walk with an
+    index seek; offset is only needed to jump to a saved position.
+    """
+    conn = get_db_connection()
+    if after_id is not None:
+        words = _fetch_block(conn, f'SELECT {WORD_COLUMNS} FROM words WHERE level = ? AND id > ? ORDER BY id LIMIT ?',
+                             (level, after_id, limit))
+    else:
+        words = _fetch_block(conn, f'SELECT {WORD_COLUMNS} FROM words WHERE level = ? ORDER BY id LIMIT ? OFFSET ?',
+                             (level, limit, offset))
+    conn.close()
+    return words
+
+def get_top_users(limit=10):
+    """Highest scores first, as (id, username, score) rows."""
+    conn = get_db_connection()
+    rows = conn.execute('SELECT id, username, score FROM users ORDER BY score DESC, id LIMIT ?', (limit,)).fetchall()
+    conn.close()
+    return rows
+
+def get_user_rank(user_id):
+    """(rank, score) for a user, 1 = top; None if the user doesn't exist."""
+    conn = get_db_connection()
+    row = conn.execute('SELECT score FROM users WHERE id = ?', (user_id,)).fetchone()
+    if not row:
+        conn.close()
+        return None
+    # Range count on idx_users_score; ties share a rank
+    above = conn.execute('SELECT count(*) FROM users WHERE score > ?', (row['score'],)).fetchone()[0]
+    conn.close()
+    return above + 1, row['score']
+
+def update_user_progress(user_id, level, index, score_increment=0):
+    conn = get_db_connection()
+    conn.execute('''UPDATE users 
+                    SET current_level = ?, current_word_index = ?, score = score + ? 
+                    WHERE id = ?''', 
+                 (level, index, score_increment, user_id))
+    conn.commit()
+    conn.close()
+    publish(Event(events.PROGRESS_CHANGED, user_id=user_id, level=level, data={"score_increment": score_increment}))
+
+def reset_user_progress_for_level(user_id, level):
+    conn = get_db_connection()
+    conn.execute('UPDATE users SET current_level = ? WHERE id = ?', (level, user_id))
+    # Reset per-level progress
+    conn.execute(LEVEL_PROGRESS_UPSERT, (user_id, level, 0))
+    conn.commit()
+    conn.close()
+    publish(Event(events.PROGRESS_RESET, user_id=user_id, level=level))
+
+# Moves the cursor without touching the level's shuffle seed
+LEVEL_PROGRESS_UPSERT = '''INSERT INTO level_progress (user_id, level, word_index) VALUES (?, ?, ?)
+                           ON CONFLICT(user_id, level) DO UPDATE SET word_index = excluded.word_index'''
+
+def get_level_progress(user_id, level):
+    """Get the saved word index for a specific level."""
+    conn = get_db_connection()
+    row = conn.execute('SELECT word_index FROM level_progress WHERE user_id = ? AND level = ?', (user_id, level)).fetchone()
+    conn.close()
+    return row['word_index'] if row else 0
+
+def set_level_progress(user_id, level, word_index):
+    """Save word index for a specific level."""
+    conn = get_db_connection()
+    conn.execute(LEVEL_PROGRESS_UPSERT, (user_id, level, word_index))
+    conn.commit()
+    conn.close()
+    publish(Event(events.PROGRESS_CHANGED, user_id=user_id, level=level))
+
+def get_shuffle(user_id, level):
+    """(seed, size) of a level's shuffled study order, or (None, None) when studying in id order.
+
+    size is the level's word count when the seed was set; the order is drawn
+    over that many positions so words added later don't reshuffle it.
+    """
+    conn = get_db_connection()
+    row = conn.execute('SELECT shuffle_seed, shuffle_size FROM level_progress WHERE user_id = ? AND level = ?',
+                       (user_id, level)).fetchone()
+    conn.close()
+    return (row['shuffle_seed'], row['shuffle_size']) if row else (None, None)
+
+def set_shuffle_seed(user_id, level, seed):
+    """Switch a level to a shuffled order (seed) or back to id order (None), from the start.
+
+    Returns the size the order is drawn over (None for id order).
+    """
+    size = count_words_in_level(level) if seed is not None else None
+    conn = get_db_connection()
+    conn.execute('''INSERT INTO level_progress (user_id, level, word_index, shuffle_seed, shuffle_size) VALUES (?, ?, 0, ?, ?)
+                    ON CONFLICT(user_id, level) DO UPDATE SET word_index = 0, shuffle_seed = excluded.shuffle_seed,
+                                                             shuffle_size = excluded.shuffle_size''',
+                 (user_id, level, seed, size))
+    conn.commit()
+    conn.close()
+    publish(Event(events.PROGRESS_RESET, user_id=user_id, level=level))
+    return size
+
+def delete_word(word_id):
+    conn = get_db_connection()
+    make_words_writable(conn)
+    conn.execute('DELETE FROM words WHERE id = ?', (word_id,))
+    conn.execute('DELETE FROM word_errors WHERE word_id = ?', (word_id,))
+    conn.commit()
+    conn.close()
+    publish(Event(events.WORD_DELETED, word_ids=(word_id,)))
+
+class WordSelection:
+    """Words selected in one level, kept symbolically.
+
+    Either explicit ids, or "every word in the level except `excluded`" after
+    select all, so selecting a 100k-word level stores nothing per word. Bulk
+    operations turn it into a WHERE clause with where().
+    """
+
+    def __init__(self, level):
+        self.level = level
+        self.all_selected = False
+        self.ids = set()
+        self.excluded = set()
+
+    @classmethod
+    def of(cls, word_ids):
+        selection = cls(None)
+        selection.ids.update(word_ids)
+        return selection
+
+    def select_all(self):
+        self.all_selected = True
+        self.ids.clear()
+        self.excluded.clear()
+
+    def clear(self):
+        self.all_selected = False
+        self.ids.clear()
+        self.excluded.clear()
+
+    def set(self, word_id, selected):
+        if self.all_selected:
+            (self.excluded.discard if selected else self.excluded.add)(word_id)
+        else:
+            (self.ids.add if selected else self.ids.discard)(word_id)
+
+    def discard(self, word_id):
+        """Forget a word that no longer exists (or left the level)."""
+        self.ids.discard(word_id)
+        self.excluded.discard(word_id)
+
+    def __contains__(self, word_id):
+        return word_id not in self.excluded if self.all_selected else word_id in self.ids
+
+    def count(self, level_total):
+        return level_total - len(self.excluded) if self.all_selected else len(self.ids)
+
+    def is_empty(self):
+        return not self.all_selected and not self.ids
+
+    def where(self):
+        """(sql, params) matching the selected rows of words, resolved by the level index."""
+        if self.all_selected:
+            return ("level = ? AND id NOT IN (SELECT value FROM json_each(?))",
+                    (self.level, json.dumps(sorted(self.excluded))))
+        return "id IN (SELECT value FROM json_each(?))", (json.dumps(sorted(self.ids)),)
+
+    def word_ids(self):
+        """The explicit ids for events, or None when the selection is symbolic."""
+        return None if self.all_selected else tuple(sorted(self.ids))
+
+def _as_selection(words):
+    return words if isinstance(words, WordSelection) else WordSelection.of(words)
+
+def delete_words_bulk(words):
+    """Delete a WordSelection (or a list of ids) in one statement. Returns the number deleted."""
+    selection = _as_selection(words)
+    if selection.is_empty():
+        return 0
+    where, params = selection.where()
+    conn = get_db_connection()
+    make_words_writable(conn)
+    conn.execute(f'DELETE FROM word_errors WHERE word_id IN (SELECT id FROM words WHERE {where})', params)
+    cur = conn.execute(f'DELETE FROM words WHERE {where}', params)
+    conn.commit()
+    conn.close()
+    publish(Event(events.WORD_DELETED, word_ids=selection.word_ids(), level=selection.level))
+    return cur.rowcount
+
+def update_word(word_id, english_word, arabic_word):
+    conn = get_db_connection()
+    make_words_writable(conn)
+    conn.execute('UPDATE words SET english_word = ?, arabic_word = ? WHERE id = ?', 
+                 (english_word, arabic_word, word_id))
+    conn.commit()
+    conn.close()
+    publish(Event(events.WORD_UPDATED, word_ids=(word_id,),
+                  data={word_id: {"english_word": english_word, "arabic_word": arabic_word}}))
+
+# Bulk edits take a WordSelection (or a list of ids, bound as one JSON array
+# through json_each), so a selection of any size is a single statement
+
+def move_words_to_level(words, level):
+    """Move the selected words to another level in one UPDATE."""
+    selection = _as_selection(words)
+    if selection.is_empty():
+        return 0
+    where, params = selection.where()
+    conn = get_db_connection()
+    make_words_writable(conn)
+    cur = conn.execute(f'UPDATE words SET level = ? WHERE {where}', (level, *params))
+    conn.commit()
+    conn.close()
+    word_ids = selection.word_ids()
+    if word_ids is None:
+        # Symbolic selection: both the source and target level changed
+        publish(Event(events.WORD_UPDATED))
+    else:
+        publish(Event(events.WORD_UPDATED, word_ids=word_ids, level=level,
+                      data={word_id: {"level": level} for word_id in word_ids}))
+    return cur.rowcount
+
+def replace_in_words(words, find, replace, column="arabic_word"):
+    """Find-and-replace text in one column of the selected words. Returns the number changed."""
+    if column not in ("english_word", "arabic_word"):
+        raise ValueError(f"Cannot replace in column {column!r}")
+    selection = _as_selection(words)
+    if selection.is_empty() or not find:
+        return 0
+    where, params = selection.where()
+    conn = get_db_connection()
+    make_words_writable(conn)
+    sql = f'UPDATE words SET {column} = replace({column}, ?, ?) WHERE {where} AND instr({column}, ?) > 0'
+    if selection.all_selected:
+        # Don't pull every changed row back; the view reloads the level instead
+        count = conn.execute(sql, (find, replace, *params, find)).rowcount
+        changed = None
+    else:
+        changed = conn.execute(sql + f' RETURNING id, {column}', (find, replace, *params, find)).fetchall()
+        count = len(changed)
+    conn.commit()
+    conn.close()
+    if changed is None:
+        publish(Event(events.WORD_UPDATED, level=selection.level))
+    elif changed:
+        publish(Event(events.WORD_UPDATED, word_ids=tuple(r[0] for r in changed),
+                      data={r[0]: {column: r[1]} for r in changed}))
+    return count
+
+def update_words_bulk(rows):
+    """Save several edited words at once. rows: (word_id, english_word, arabic_word) tuples."""
+    rows = list(rows)
+    if not rows:
+        return
+    conn = get_db_connection()
+    make_words_writable(conn)
+    conn.executemany('UPDATE words SET english_word = ?, arabic_word = ? WHERE id = ?',
+                     [(en, ar, word_id) for word_id, en, ar in rows])
+    conn.commit()
+    conn.close()
+    publish(Event(events.WORD_UPDATED, word_ids=tuple(r[0] for r in rows),
+                  data={word_id: {"english_word": en, "arabic_word": ar} for word_id, en, ar in rows}))
+
+def get_word_count_by_level():
+    conn = get_db_connection()
+    rows = conn.execute('SELECT level, count(*) as cnt FROM words GROUP BY level ORDER BY level').fetchall()
+    conn.close()
+    return {r['level']: r['cnt'] for r in rows}
+
+def increment_word_error(user_id, word_id):
+    """Increment error count for a word."""
+    conn = get_db_connection()
+    conn.execute('''INSERT INTO word_errors (user_id, word_id, error_count) 
+                    VALUES (?, ?, 1)
+                    ON CONFLICT(user_id, word_id) 
+                    DO UPDATE SET error_count = error_count + 1''', (user_id, word_id))
+    conn.commit()
+    conn.close()
+    publish(Event(events.ERROR_RECORDED, user_id=user_id, word_ids=(word_id,)))
+
+def get_difficult_words(user_id, min_errors=3):
+    """Get words where user made errors >= min_errors."""
+    conn = get_db_connection()
+    words = _fetch_block(conn, '''SELECT w.id, w.level, w.english_word, w.arabic_word, we.error_count
+                                 FROM word_errors we
+                                 JOIN words w ON we.word_id = w.id
+                                 WHERE we.user_id = ? AND we.error_count >= ?
+                                 ORDER BY we.error_count DESC, we.word_id''', (user_id, min_errors), with_errors=True)
+    conn.close()
+    return words
+
+# Default threshold and page size for the difficult-words queue
+DIFFICULT_MIN_ERRORS = 3
+DIFFICULT_PAGE_SIZE = 20
+
+def get_difficult_words_page(user_id, min_errors=DIFFICULT_MIN_ERRORS, level=None, limit=DIFFICULT_PAGE_SIZE, cursor=None):
+    """Get the next page of difficult words, most errors first.
+
+    cursor is the (error_count, word_id) returned by the previous call, or None
+    for the first page. Returns (words, next_cursor); next_cursor is None when
+    there are no more pages.
+    """
+    sql = '''SELECT w.id, w.level, w.english_word, w.arabic_word, we.error_count
+             FROM word_errors we
+             JOIN words w ON we.word_id = w.id
+             WHERE we.user_id = ? AND we.error_count >= ?'''
+    params = [user_id, min_errors]
+    if level is not None:
+        sql += ' AND w.level = ?'
+        params.append(level)
+    if cursor is not None:
+        last_count, last_id = cursor
+        sql += ' AND (we.error_count < ? OR (we.error_count = ? AND we.word_id > ?))'
+        params += [last_count, last_count, last_id]
+    sql += ' ORDER BY we.error_count DESC, we.word_id LIMIT ?'
+    params.append(limit)
+
+    conn = get_db_connection()
+    words = _fetch_block(conn, sql, params, with_errors=True)
+    conn.close()
+    next_cursor = (words[-1]['error_count'], words[-1]['id']) if len(words) == limit else None
+    return words, next_cursor
+
+def count_difficult_words(user_id, min_errors=DIFFICULT_MIN_ERRORS, level=None):
+    """Count words where user made errors >= min_errors."""
+    conn = get_db_connection()
+    if level is None:
+        row = conn.execute('''SELECT count(*) FROM word_errors
+                              WHERE user_id = ? AND error_count >= ?
+                              AND word_id IN (SELECT id FROM words)''', (user_id, min_errors)).fetchone()
+    else:
+        row = conn.execute('''SELECT count(*) FROM word_errors we
+                              JOIN words w ON we.word_id = w.id
+                              WHERE we.user_id = ? AND we.error_count >= ? AND w.level = ?''',
+                           (user_id, min_errors, level)).fetchone()
+    conn.close()
+    return row[0]
+
+def remove_from_difficult(user_id, word_id):
+    """Remove a word from difficult list (reset error count)."""
+    conn = get_db_connection()
+    conn.execute('DELETE FROM word_errors WHERE user_id = ? AND word_id = ?', (user_id, word_id))
+    conn.commit()
+    conn.close()
+    publish(Event(events.ERROR_CLEARED, user_id=user_id, word_ids=(word_id,)))
+
+def get_last_user():
+    """Load last username from file for auto-login."""
+    try:
+        path = os.path.join(os.path.dirname(get_db_path()), "last_user.txt")
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read().strip()
+    except: pass
+    return None
+
+def set_last_user(username):
+    """Save last username for auto-login."""
+    try:
+        path = os.path.join(os.path.dirname(get_db_path()), "last_user.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(username)
+    except: pass
+
+def clear_last_user():
+    """Clear saved username on logout."""
+    try:
+        path = os.path.join(os.path.dirname(get_db_path()), "last_user.txt")
+        if os.path.exists(path):
+            os.remove(path)
+    except: pass
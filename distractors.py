@@ -0,0 +1,179 @@
+import os
+import random
+import datetime
+import threading
+import events
+from database import get_words_by_level
+
+# Wrong answers offered next to the right one in multiple-choice mode
+CHOICES = 4
+# Random draws tried per bucket before moving to a looser one
+DRAWS_PER_BUCKET = 8
+
+def log_distractors(msg):
+    log_file = os.path.join(os.path.expanduser("~"), "english_mastery_debug.log")
+    try:
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(f"[{timestamp}] [DISTRACTORS] {msg}\n")
+    except: pass
+
+def _keys(english):
+    """Buckets a word belongs to, most to least plausible as a distractor."""
+    w = english.lower()
+    return (("prefix", w[:2]), ("suffix", w[-2:]), ("length", len(w)), ("all", None))
+
+class _Bucket:
+    """List of ids with O(1) random pick, add and remove (swap with the last)."""
+    __slots__ = ("ids", "pos")
+
+    def __init__(self):
+        self.ids = []
+        self.pos = {}
+
+    def add(self, word_id):
+        self.pos[word_id] = len(self.ids)
+        self.ids.append(word_id)
+
+    def remove(self, word_id):
+        i = self.pos.pop(word_id)
+        last = self.ids.pop()
+        if last != word_id:
+            self.ids[i] = last
+            self.pos[last] = i
+
+class DistractorIndex:
+    """One level's words bucketed by 2-letter prefix, 2-letter suffix and length.
+
+    Built with one scan of the level; picking distractors is a bounded
+    number of random draws from the answer's buckets, whatever the level
+    size. Words are added/removed in place as they change.
+    """
+
+    def __init__(self, level):
+        self.level = level
+        self.english = {}  # word id -> english_word
+        self.buckets = {}
+        for w in get_words_by_level(level):
+            self.add(w['id'], w['english_word'])
+
+    def add(self, word_id, english):
+        if word_id in self.english:
+            self.remove(word_id)
+        self.english[word_id] = english
+        for key in _keys(english):
+            self.buckets.setdefault(key, _Bucket()).add(word_id)
+
+    def remove(self, word_id):
+        english = self.english.pop(word_id, None)
+        if english is None:
+            return
+        for key in _keys(english):
+            bucket = self.buckets[key]
+            bucket.remove(word_id)
+            if not bucket.ids:
+                del self.buckets[key]
+
+    def pick(self, english, count=CHOICES - 1):
+        """Up to `count` distinct english words that look like `english` (never `english` itself)."""
+        answer = english.lower()
+        picked = []
+        seen = {answer}
+        for key in _keys(english):
+            bucket = self.buckets.get(key)
+            if not bucket:
+                continue
+            for _ in range(DRAWS_PER_BUCKET):
+                candidate = self.english[random.choice(bucket.ids)]
+                if candidate.lower() not in seen:
+                    seen.add(candidate.lower())
+                    picked.append(candidate)
+                    if len(picked) == count:
+                        return picked
+        return picked
+
+_indexes = {}  # level -> DistractorIndex
+_lock = threading.RLock()
+
+def get_index(level):
+    """The level's index, built on first use (one level scan; call off the event loop)."""
+    with _lock:
+        index = _indexes.get(level)
+    if index is None:
+        index = DistractorIndex(level)
+        with _lock:
+            index = _indexes.setdefault(level, index)
+    return index
+
+def get_choices(word, count=CHOICES):
+    """The answer plus up to count-1 distractors from its level, shuffled."""
+    index = get_index(word['level'])
+    with _lock:
+        choices = index.pick(word['english_word'], count - 1) + [word['english_word']]
+    random.shuffle(choices)
+    return choices
+
+_replay = []  # one list per running rebuild: word events published while it scans
+
+def _rebuild(levels):
+    queue = []
+    with _lock:
+        _replay.append(queue)
+    stale = set()
+    try:
+        for level in levels:
+            try:
+                index = DistractorIndex(level)
+                with _lock:
+                    if level in _indexes:
+                        _indexes[level] = index
+                        # The scan may have missed changes published while it ran;
+                        # applying a word event twice leaves the same result
+                        for event in queue:
+                            stale |= _apply(event)
+            except Exception as ex:
+                log_distractors(f"Rebuild of level {level} failed: {ex}")
+    finally:
+        with _lock:
+            _replay.remove(queue)
+    if stale:
+        threading.Thread(target=_rebuild, args=(sorted(stale),), daemon=True).start()
+
+def _apply(event):
+    """Apply a word event with ids to the loaded indexes (under _lock). Returns levels to rebuild."""
+    stale = set()
+    for word_id in event.word_ids:
+        source = next((index for index in _indexes.values() if word_id in index.english), None)
+        if event.type == events.WORD_DELETED:
+            if source:
+                source.remove(word_id)
+            continue
+        fields = event.data[word_id]
+        english = fields.get("english_word") or (source.english[word_id] if source else None)
+        target = _indexes.get(fields["level"]) if "level" in fields else source
+        if source and source is not target:
+            source.remove(word_id)
+        if target and english:
+            target.add(word_id, english)
+        elif target:
+            # Moved in from a level that isn't loaded: its text isn't known here
+            stale.add(target.level)
+    return stale
+
+def _on_word_event(event):
+    with _lock:
+        if not _indexes:
+            return
+        if event.word_ids is None:
+            # Import, pack install or bulk relevel: rebuild the affected levels off this thread
+            levels = [event.level] if event.level in _indexes else list(_indexes) if event.level is None else []
+            if levels:
+                threading.Thread(target=_rebuild, args=(levels,), daemon=True).start()
+            return
+        for queue in _replay:
+            queue.append(event)
+        stale = _apply(event)
+    if stale:
+        threading.Thread(target=_rebuild, args=(sorted(stale),), daemon=True).start()
+
+events.subscribe(_on_word_event, *events.WORD_EVENTS)
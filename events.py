@@ -0,0 +1,65 @@
+import os
+import weakref
+import datetime
+import threading
+from collections import namedtuple
+
+# Event types published by the data layer after a change is committed
+WORD_ADDED = "word_added"            # level (word_ids None for bulk imports/pack installs)
+WORD_UPDATED = "word_updated"        # word_ids, data = {word_id: changed fields} (word_ids None: many words relevelled)
+WORD_DELETED = "word_deleted"        # word_ids (None: a select-all of `level`)
+PROGRESS_CHANGED = "progress_changed"  # user_id, level, data = {"score_increment": n} when scored
+PROGRESS_RESET = "progress_reset"    # user_id, level
+ERROR_RECORDED = "error_recorded"    # user_id, word_ids
+ERROR_CLEARED = "error_cleared"      # user_id, word_ids
+
+WORD_EVENTS = (WORD_ADDED, WORD_UPDATED, WORD_DELETED)
+
+Event = namedtuple("Event", "type user_id word_ids level data", defaults=(None, None, None, None))
+
+def log_events(msg):
+    log_file = os.path.join(os.path.expanduser("~"), "english_mastery_debug.log")
+    try:
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(f"[{timestamp}] [EVENTS] {msg}\n")
+    except: pass
+
+_subscribers = {}  # event type -> list of (handler or weakref, is_weak)
+_lock = threading.Lock()
+
+def subscribe(handler, *event_types, weak=False):
+    """Call handler(event) for each published event of the given types.
+
+    Handlers run synchronously on the publishing thread (often a DB worker),
+    so anything touching the UI should hand off with page.run_task. With
+    weak=True the bus doesn't keep the handler alive: store it on the object
+    that owns it (e.g. view.data) and it unsubscribes itself when that goes away.
+    """
+    ref = weakref.ref(handler) if weak else handler
+    with _lock:
+        for event_type in event_types:
+            _subscribers.setdefault(event_type, []).append((ref, weak))
+    return handler
+
+def unsubscribe(handler):
+    with _lock:
+        for event_type, entries in _subscribers.items():
+            _subscribers[event_type] = [(r, w) for r, w in entries if (r() if w else r) is not handler]
+
+def publish(event):
+    with _lock:
+        entries = list(_subscribers.get(event.type, ()))
+    dead = False
+    for ref, weak in entries:
+        handler = ref() if weak else ref
+        if handler is None:
+            dead = True
+            continue
+        try:
+            handler(event)
+        except Exception as ex:
+            log_events(f"Handler {handler!r} failed on {event.type}: {ex}")
+    if dead:
+        with _lock:
+            _subscribers[event.type] = [(r, w) for r, w in _subscribers.get(event.type, []) if not w or r() is not None]
@@ -0,0 +1,141 @@
+import csv
+import json
+import threading
+from database import get_db_connection
+
+# Rows are pulled from the cursor in chunks so exports run in constant memory
+FETCH_SIZE = 500
+
+EXPORT_FORMATS = ("csv", "jsonl", "xlsx")
+
+# dataset -> (columns, SQL, filter columns)
+DATASETS = {
+    "words": (
+        ["id", "level", "english_word", "arabic_word"],
+        "SELECT id, level, english_word, arabic_word FROM words",
+        {"level": "level"},
+    ),
+    # word_index of a shuffled level is a position in the order given by
+    # shuffle_seed over shuffle_size words (both empty for id order)
+    "progress": (
+        ["username", "level", "word_index", "shuffle_seed", "shuffle_size"],
+        """SELECT u.username, lp.level, lp.word_index, lp.shuffle_seed, lp.shuffle_size
+           FROM level_progress lp JOIN users u ON lp.user_id = u.id""",
+        {"username": "u.username", "level": "lp.level"},
+    ),
+    "errors": (
+        ["username", "word_id", "level", "english_word", "arabic_word", "error_count"],
+        """SELECT u.username, we.word_id, w.level, w.english_word, w.arabic_word, we.error_count
+           FROM word_errors we
+           JOIN users u ON we.user_id = u.id
+           JOIN words w ON we.word_id = w.id""",
+        {"username": "u.username", "level": "w.level"},
+    ),
+}
+
+def iter_rows(dataset, **filters):
+    """Yield tuples for a dataset, optionally filtered by username/level."""
+    columns, sql, filter_cols = DATASETS[dataset]
+    clauses, params = [], []
+    for key, value in filters.items():
+        if value is None:
+            continue
+        if key not in filter_cols:
+            raise ValueError(f"Dataset '{dataset}' cannot be filtered by {key}")
+        clauses.append(f"{filter_cols[key]} = ?")
+        params.append(value)
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY 1, 2"
+
+    conn = get_db_connection()
+    try:
+        cur = conn.execute(sql, params)
+        while True:
+            chunk = cur.fetchmany(FETCH_SIZE)
+            if not chunk:
+                break
+            for row in chunk:
+                yield tuple(row)
+    finally:
+        conn.close()
+
+def _write_csv(path, columns, rows):
+    count = 0
+    # utf-8-sig so Excel opens Arabic text correctly
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+def _write_jsonl(path, columns, rows):
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    return count
+
+def _write_xlsx(path, columns, rows):
+    from openpyxl import Workbook
+    # Write-only workbooks stream rows to disk instead of building the sheet in memory
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(columns)
+    count = 0
+    for row in rows:
+        ws.append(list(row))
+        count += 1
+    wb.save(path)
+    return count
+
+WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl, "xlsx": _write_xlsx}
+
+def export_dataset(dataset, path, fmt=None, **filters):
+    """Stream a dataset to a file. Returns the number of rows written."""
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset}'")
+    if fmt is None:
+        fmt = path.rsplit(".", 1)[-1].lower()
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported export format '{fmt}'")
+    columns = DATASETS[dataset][0]
+    return WRITERS[fmt](path, columns, iter_rows(dataset, **filters))
+
+def export_in_background(dataset, path, fmt=None, on_done=None, **filters):
+    """Run export_dataset on a worker thread.
+
+    on_done(count, error) is called from the worker when the export finishes.
+    """
+    def worker():
+        try:
+            count = export_dataset(dataset, path, fmt, **filters)
+        except Exception as ex:
+            if on_done:
+                on_done(0, ex)
+            return
+        if on_done:
+            on_done(count, None)
+
+    t = threading.Thread(target=worker, name=f"export-{dataset}", daemon=True)
+    t.start()
+    return t
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Export vocabulary and learner progress")
+    parser.add_argument("dataset", choices=sorted(DATASETS))
+    parser.add_argument("out", help="output file (.csv, .jsonl or .xlsx)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="defaults to the output file extension")
+    parser.add_argument("--level", type=int)
+    parser.add_argument("--username")
+    args = parser.parse_args()
+    filters = {"level": args.level}
+    if args.username:
+        filters["username"] = args.username
+    n = export_dataset(args.dataset, args.out, args.format, **filters)
+    print(f"Exported {n} rows to {args.out}")
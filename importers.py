@@ -0,0 +1,90 @@
+import os
+import csv
+from database import get_db_connection, make_words_writable
+
+# Rows are inserted in batches of this size
+IMPORT_BATCH_SIZE = 500
+
+IMPORT_FORMATS = ("xlsx", "csv")
+
+def log_import(msg):
+    try:
+        import datetime
+        log_file = os.path.join(os.path.expanduser("~"), "english_mastery_debug.log")
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(f"[{timestamp}] [IMPORT] {msg}\n")
+    except: pass
+
+def parse_row(row):
+    """(english, arabic) from a sheet row, or None for headers/blank rows.
+
+    Two columns are read as english, arabic; three or more as
+    level/index, english, arabic.
+    """
+    # Convert to strings, skip None
+    cells = [str(c).strip() if c is not None else "" for c in row]
+
+    # Skip header heuristic
+    if cells and ("english" in cells[0].lower() or "level" in cells[0].lower() or "word" in cells[0].lower()):
+        return None
+
+    en, ar = "", ""
+    if len(cells) == 2:
+        en, ar = cells[0], cells[1]
+    elif len(cells) >= 3:
+        en, ar = cells[1], cells[2]
+
+    if en and ar:
+        return en, ar
+    return None
+
+def iter_xlsx_rows(path):
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True)
+    try:
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+def iter_csv_rows(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.reader(f)
+
+def import_words(path, level, fmt=None):
+    """Insert every word in an .xlsx/.csv file into `level`. Returns the number imported."""
+    fmt = fmt or os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+    rows = iter_xlsx_rows(path) if fmt == "xlsx" else iter_csv_rows(path)
+
+    conn = get_db_connection()
+    make_words_writable(conn)
+    count = 0
+    batch = []
+    try:
+        for row in rows:
+            try:
+                parsed = parse_row(row)
+            except Exception as row_ex:
+                log_import(f"Skipping row {row}: {row_ex}")
+                continue
+            if parsed:
+                batch.append((level, parsed[0], parsed[1]))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                conn.executemany('INSERT INTO words (level, english_word, arabic_word) VALUES (?, ?, ?)', batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            conn.executemany('INSERT INTO words (level, english_word, arabic_word) VALUES (?, ?, ?)', batch)
+            count += len(batch)
+        conn.commit()
+    finally:
+        conn.close()
+    log_import(f"Imported {count} words from {path} into level {level}")
+    if count:
+        import events
+        events.publish(events.Event(events.WORD_ADDED, level=level))
+    from maintenance import after_bulk_change
+    after_bulk_change(count)
+    return count
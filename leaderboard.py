@@ -0,0 +1,58 @@
+import time
+import threading
+import database
+import events
+
+# Seconds a cached result is served before the database is asked again
+TOP_TTL = 15
+RANK_TTL = 10
+TOP_LIMIT = 20
+
+class TTLCache:
+    """Tiny thread-safe cache: each key is recomputed at most once per ttl seconds."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        now = time.monotonic()
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit and hit[0] > now:
+                return hit[1]
+        value = compute()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+_top_cache = TTLCache(TOP_TTL)
+_rank_cache = TTLCache(RANK_TTL)
+
+def get_top(limit=TOP_LIMIT):
+    """Top `limit` users as plain (id, username, score) tuples, cached for TOP_TTL seconds."""
+    return _top_cache.get(limit, lambda: [tuple(r) for r in database.get_top_users(limit)])
+
+def get_rank(user_id):
+    """(rank, score) for a user, cached for RANK_TTL seconds."""
+    return _rank_cache.get(user_id, lambda: database.get_user_rank(user_id))
+
+def invalidate():
+    _top_cache.clear()
+    _rank_cache.clear()
+
+def _on_progress_changed(event):
+    # The scorer sees their new rank right away; everyone else within RANK_TTL
+    if event.data and event.data.get("score_increment"):
+        _rank_cache.discard(event.user_id)
+
+events.subscribe(_on_progress_changed, events.PROGRESS_CHANGED)
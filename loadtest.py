@@ -0,0 +1,313 @@
+import os
+import time
+import random
+import shutil
+import asyncio
+import sqlite3
+import tempfile
+import tracemalloc
+import threading
+import database
+
+# Statements timed by TimedConnection (their time includes waiting for the write lock)
+WRITE_VERBS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+class Recorder:
+    """Thread-safe sample lists (handlers run on the loop, DB writes on executor threads)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+        self.counters = {}
+
+    def add(self, name, value):
+        with self._lock:
+            self.samples.setdefault(name, []).append(value)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+def percentiles(values, points=(50, 90, 99)):
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {f"p{p}": round(ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))], 2) for p in points}
+    result["max"] = round(ordered[-1], 2)
+    return result
+
+_recorder = None
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3 connection that records how long write statements and commits take."""
+
+    def _timed(self, method, sql, *args):
+        is_write = sql.lstrip().upper().startswith(WRITE_VERBS)
+        start = time.perf_counter()
+        try:
+            return method(sql, *args)
+        except sqlite3.OperationalError as ex:
+            if "locked" in str(ex):
+                _recorder.count("db_locked_errors")
+            raise
+        finally:
+            if is_write:
+                _recorder.add("db_write_ms", (time.perf_counter() - start) * 1000)
+
+    def execute(self, sql, *args):
+        return self._timed(super().execute, sql, *args)
+
+    def executemany(self, sql, *args):
+        return self._timed(super().executemany, sql, *args)
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            _recorder.add("db_commit_ms", (time.perf_counter() - start) * 1000)
+
+
+class LoadTestSession(dict):
+    def set(self, key, value):
+        self[key] = value
+
+
+class LoadTestPage:
+    """Just enough of ft.Page for the views: updates are counted, not sent anywhere."""
+
+    def __init__(self):
+        self.views = []
+        self.overlay = []
+        self.session = LoadTestSession()
+        self.route = "/"
+        self.snack_bar = None
+        self.on_keyboard_event = None
+        self.updates = 0
+        self.tasks = []
+        # Pages are created on the loop the learners run on
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.current_thread()
+
+    def update(self, *controls):
+        self.updates += 1
+
+    def go(self, route):
+        self.route = route
+
+    def open(self, control):
+        control.open = True
+
+    def close(self, control):
+        control.open = False
+
+    def run_task(self, handler, *args):
+        # Like Flet's, callable from worker threads (event bus handlers)
+        if threading.current_thread() is not self.loop_thread:
+            return asyncio.run_coroutine_threadsafe(handler(*args), self.loop)
+        task = self.loop.create_task(handler(*args))
+        self.tasks.append(task)
+        return task
+
+    async def settle(self):
+        """Wait for background tasks started by the views (e.g. the dashboard stats refresh)."""
+        tasks, self.tasks = self.tasks, []
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _walk(control):
+    yield control
+    content = getattr(control, "content", None)
+    if content is not None and not isinstance(content, str):
+        yield from _walk(content)
+    for child in getattr(control, "controls", None) or []:
+        yield from _walk(child)
+
+def _find(view, predicate):
+    return next((c for c in _walk(view) if predicate(c)), None)
+
+
+class Learner:
+    def __init__(self, number, user_id, username, level, mode, args, recorder):
+        self.number = number
+        self.user_id = user_id
+        self.username = username
+        self.level = level
+        self.mode = mode
+        self.args = args
+        self.recorder = recorder
+        self.page = LoadTestPage()
+        self.view = None
+        self.answers = 0
+
+    def build(self, route):
+        from session_utils import set_session
+        from views.dashboard_view import DashboardView
+        from views.learning_view import LearningView
+        from views.difficult_words_view import DifficultWordsView
+        # session_utils keeps a process-wide fallback that get_session() checks
+        # first, so views are built right after this learner's session is set
+        set_session(self.page, "username", self.username)
+        set_session(self.page, "user_id", self.user_id)
+        set_session(self.page, "current_level", self.level)
+        start = time.perf_counter()
+        factory = {"/dashboard": DashboardView, "/learn": LearningView, "/difficult": DifficultWordsView}[route]
+        self.view = factory(self.page)
+        self.recorder.add(f"build{route}_ms", (time.perf_counter() - start) * 1000)
+        self.page.route = route
+
+    def _answer_field(self):
+        from flet import TextField
+        return _find(self.view, lambda c: isinstance(c, TextField) and c.on_submit and c.visible is not False)
+
+    async def answer_once(self):
+        from flet import IconButton, Text
+        field = self._answer_field()
+        if field is None:
+            # Level finished / difficult queue empty: study the next level
+            self.level = self.level % 6 + 1
+            self.build("/learn")
+            return
+
+        # Reveal the word through the UI to know the right answer
+        reveal = _find(self.view, lambda c: isinstance(c, IconButton) and c.tooltip == "Show English word")
+        reveal.on_click(None)
+        shown = _find(self.view, lambda c: isinstance(c, Text) and c.color == "amber" and c.visible and c.value)
+        correct = random.random() < self.args.accuracy
+        field.value = shown.value if (correct and shown) else "wrong answer"
+
+        start = time.perf_counter()
+        await field.on_submit(None)
+        self.recorder.add("answer_ms", (time.perf_counter() - start) * 1000)
+        if correct:
+            start = time.perf_counter()
+            await field.on_submit(None)
+            self.recorder.add("advance_ms", (time.perf_counter() - start) * 1000)
+        self.answers += 1
+
+        if self.args.dashboard_every and self.answers % self.args.dashboard_every == 0:
+            self.build("/dashboard")
+            await self.page.settle()
+            self.build("/learn" if self.mode == "learn" else "/difficult")
+
+    async def run(self, deadline):
+        while time.monotonic() < deadline:
+            await asyncio.sleep(random.expovariate(self.args.rate))
+            try:
+                await self.answer_once()
+            except Exception as ex:
+                self.recorder.count("handler_errors")
+                self.recorder.add("errors", f"learner {self.number}: {ex!r}")
+
+
+def _prepare_database(args):
+    """Point the data layer at a scratch progress database with N learner accounts."""
+    scratch_dir = tempfile.mkdtemp(prefix="english_mastery_load_")
+    database._DB_PATH = os.path.join(scratch_dir, database.DB_NAME)
+    from seed_data import seed_data
+    seed_data()
+
+    users = []
+    conn = database.get_db_connection()
+    word_ids = [r[0] for r in conn.execute('SELECT id FROM words')]
+    for i in range(args.learners):
+        cur = conn.execute('INSERT INTO users (username) VALUES (?)', (f"load-{i}",))
+        users.append((cur.lastrowid, f"load-{i}"))
+    # Learners reviewing difficult words need a queue to work through
+    difficult = int(args.learners * args.difficult_share)
+    for user_id, _ in users[:difficult]:
+        conn.executemany('INSERT INTO word_errors (user_id, word_id, error_count) VALUES (?, ?, 3)',
+                         [(user_id, w) for w in random.sample(word_ids, min(200, len(word_ids)))])
+    conn.commit()
+    conn.close()
+    return scratch_dir, users, difficult
+
+async def _run(args):
+    global _recorder
+    recorder = _recorder = Recorder()
+    scratch_dir, users, difficult = _prepare_database(args)
+
+    real_connect = sqlite3.connect
+    def timed_connect(*a, **kw):
+        kw.setdefault("factory", TimedConnection)
+        return real_connect(*a, **kw)
+    sqlite3.connect = timed_connect
+
+    # Import the views up front so module loading isn't counted as session memory
+    import views.dashboard_view, views.learning_view, views.difficult_words_view
+
+    try:
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        learners = []
+        for i, (user_id, username) in enumerate(users):
+            mode = "difficult" if i < difficult else "learn"
+            learner = Learner(i, user_id, username, random.randint(1, 6), mode, args, recorder)
+            learner.build("/dashboard")
+            await learner.page.settle()
+            learner.build("/learn" if mode == "learn" else "/difficult")
+            learners.append(learner)
+        per_session = (tracemalloc.get_traced_memory()[0] - baseline) / max(1, len(learners))
+        tracemalloc.stop()
+
+        started = time.monotonic()
+        await asyncio.gather(*(l.run(started + args.duration) for l in learners))
+        elapsed = time.monotonic() - started
+
+        from attempt_log import flush_attempts
+        flush_attempts()
+    finally:
+        sqlite3.connect = real_connect
+
+    answers = sum(l.answers for l in learners)
+    report = {
+        "learners": len(learners),
+        "difficult_learners": difficult,
+        "duration_s": round(elapsed, 1),
+        "answers": answers,
+        "answers_per_s": round(answers / elapsed, 1) if elapsed else 0,
+        "answer_ms": percentiles(recorder.samples.get("answer_ms", [])),
+        "advance_ms": percentiles(recorder.samples.get("advance_ms", [])),
+        "db_write_ms": percentiles(recorder.samples.get("db_write_ms", [])),
+        "db_commit_ms": percentiles(recorder.samples.get("db_commit_ms", [])),
+        "db_locked_errors": recorder.counters.get("db_locked_errors", 0),
+        "handler_errors": recorder.counters.get("handler_errors", 0),
+        "page_updates": sum(l.page.updates for l in learners),
+        "memory_per_session_kb": round(per_session / 1024, 1),
+    }
+    if args.keep_db:
+        report["scratch_db"] = database.get_db_path()
+    else:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+    for route in ("/dashboard", "/learn", "/difficult"):
+        report[f"build{route}_ms"] = percentiles(recorder.samples.get(f"build{route}_ms", []))
+    if recorder.samples.get("errors"):
+        report["first_errors"] = recorder.samples["errors"][:5]
+    return report
+
+def run_load_test(learners=20, rate=1.0, duration=30.0, accuracy=0.8, difficult_share=0.2, dashboard_every=25, seed=None, keep_db=False):
+    """Drive the real views with simulated learners against a scratch database. Returns a report dict."""
+    import argparse
+    args = argparse.Namespace(learners=learners, rate=rate, duration=duration, accuracy=accuracy,
+                              difficult_share=difficult_share, dashboard_every=dashboard_every, keep_db=keep_db)
+    if seed is not None:
+        random.seed(seed)
+    return asyncio.run(_run(args))
+
+if __name__ == "__main__":
+    import json
+    import argparse
+    parser = argparse.ArgumentParser(description="Simulate concurrent learners against the real views")
+    parser.add_argument("--learners", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=1.0, help="answers per second per learner (mean)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--accuracy", type=float, default=0.8, help="share of correct answers")
+    parser.add_argument("--difficult-share", type=float, default=0.2, help="share of learners in the difficult-words view")
+    parser.add_argument("--dashboard-every", type=int, default=25, help="answers between dashboard visits (0 = never)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--keep-db", action="store_true", help="keep the scratch database for inspection")
+    args = parser.parse_args()
+    report = run_load_test(args.learners, args.rate, args.duration, args.accuracy,
+                           args.difficult_share, args.dashboard_every, args.seed, args.keep_db)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
@@ -0,0 +1,178 @@
+import os
+import time
+import sqlite3
+import datetime
+from database import get_db_connection, get_db_path
+
+# Rowid range handled per GC transaction; keeps each write lock short
+GC_BATCH_SIZE = 2000
+# Pause between GC batches (seconds) so other writers can get in
+GC_BATCH_SLEEP = 0.01
+# Imports/deletes touching at least this many rows refresh planner statistics
+ANALYZE_MIN_ROWS = 1000
+# Free pages tolerated before an incremental vacuum returns them to the OS
+FREELIST_VACUUM_PAGES = 256
+# Attempts (and pause in seconds) when the one-off VACUUM finds the database busy
+VACUUM_BUSY_RETRIES = 5
+VACUUM_BUSY_SLEEP = 0.5
+
+def log_maintenance(msg):
+    log_file = os.path.join(os.path.expanduser("~"), "english_mastery_debug.log")
+    try:
+        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(f"[{timestamp}] [MAINTENANCE] {msg}\n")
+    except: pass
+
+def _free_bytes(conn):
+    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+    return conn.execute('PRAGMA freelist_count').fetchone()[0] * page_size
+
+def _file_size():
+    try:
+        return os.path.getsize(get_db_path())
+    except OSError:
+        return 0
+
+def optimize_db():
+    """PRAGMA optimize: lets SQLite re-analyze tables whose statistics look stale."""
+    conn = get_db_connection()
+    try:
+        conn.execute('PRAGMA optimize')
+    finally:
+        conn.close()
+
+def analyze_db():
+    before = _file_size()
+    conn = get_db_connection()
+    try:
+        conn.execute('ANALYZE main')
+        conn.commit()
+    finally:
+        conn.close()
+    log_maintenance(f"ANALYZE done (file {before} -> {_file_size()} bytes)")
+
+def enable_incremental_vacuum():
+    """Switch the database to auto_vacuum=INCREMENTAL (one full VACUUM, only the first time).
+
+    The VACUUM rewrites the whole file and blocks every writer while it
+    runs, so call this before the UI and background jobs start (main.py)
+    or from `cli.py vacuum`, never alongside them.
+    """
+    conn = get_db_connection()
+    try:
+        if conn.execute('PRAGMA main.auto_vacuum').fetchone()[0] == 2:
+            return False
+        before = _file_size()
+        # The new mode only takes effect once the file is rebuilt
+        conn.execute('PRAGMA main.auto_vacuum = INCREMENTAL')
+        for attempt in range(VACUUM_BUSY_RETRIES):
+            try:
+                conn.execute('VACUUM main')
+                break
+            except sqlite3.OperationalError as e:
+                # Another process (e.g. a second app instance) holds the file
+                if ("locked" not in str(e) and "busy" not in str(e)) or attempt == VACUUM_BUSY_RETRIES - 1:
+                    raise
+                time.sleep(VACUUM_BUSY_SLEEP)
+    finally:
+        conn.close()
+    log_maintenance(f"Enabled incremental vacuum (file {before} -> {_file_size()} bytes)")
+    return True
+
+def incremental_vacuum_if_needed(threshold=FREELIST_VACUUM_PAGES):
+    """Release free pages to the OS once the freelist grows past `threshold`. Returns bytes released."""
+    conn = get_db_connection()
+    try:
+        free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if free_pages <= threshold:
+            return 0
+        before = _file_size()
+        # execute() steps the pragma only once (one page); executescript runs it to completion
+        conn.executescript('PRAGMA main.incremental_vacuum;')
+    finally:
+        conn.close()
+    after = _file_size()
+    log_maintenance(f"Incremental vacuum of {free_pages} free pages (file {before} -> {after} bytes)")
+    return before - after
+
+def after_bulk_change(rows):
+    """Call after a large import or bulk delete: refresh statistics and reclaim space if worthwhile."""
+    try:
+        if rows >= ANALYZE_MIN_ROWS:
+            analyze_db()
+        incremental_vacuum_if_needed()
+    except Exception as e:
+        log_maintenance(f"Post-change maintenance failed: {e}")
+
+# table -> condition selecting orphaned rows
+ORPHAN_RULES = {
+    "word_errors": "(word_id NOT IN (SELECT id FROM words) OR user_id NOT IN (SELECT id FROM users))",
+    "level_progress": "user_id NOT IN (SELECT id FROM users)",
+}
+
+def collect_garbage(batch_size=GC_BATCH_SIZE, sleep=GC_BATCH_SLEEP):
+    """Delete orphaned word_errors/level_progress rows in small rowid batches.
+
+    Each batch is its own transaction, so the learning view is never locked
+    out for long. Returns a dict with rows removed per table and the number
+    of bytes freed inside the database file (pages moved to the freelist).
+    """
+    conn = get_db_connection()
+    report = {}
+    free_before = _free_bytes(conn)
+    for table, condition in ORPHAN_RULES.items():
+        removed = 0
+        max_id = conn.execute(f'SELECT max(rowid) FROM {table}').fetchone()[0] or 0
+        start = 0
+        while start < max_id:
+            cur = conn.execute(
+                f'DELETE FROM {table} WHERE rowid > ? AND rowid <= ? AND {condition}',
+                (start, start + batch_size),
+            )
+            conn.commit()
+            removed += cur.rowcount
+            start += batch_size
+            if sleep:
+                time.sleep(sleep)
+        report[table] = removed
+    report["bytes_freed"] = _free_bytes(conn) - free_before
+    conn.close()
+    log_maintenance(f"GC removed {report}")
+    return report
+
+def run_pending_gc():
+    """Run collect_garbage() once after a schema migration flagged orphans."""
+    from database import get_meta, set_meta
+    if get_meta("orphan_gc_pending") != "1":
+        return None
+    report = collect_garbage()
+    set_meta("orphan_gc_pending", "0")
+    return report
+
+def run_startup_jobs():
+    """Background housekeeping run once per launch."""
+    try:
+        run_pending_gc()
+    except Exception as e:
+        log_maintenance(f"Orphan GC failed: {e}")
+    try:
+        from analytics import refresh_rollups
+        refresh_rollups()
+    except Exception as e:
+        log_maintenance(f"Rollup refresh failed: {e}")
+    try:
+        from attempt_log import compact_attempts
+        compacted = compact_attempts()
+        if compacted:
+            log_maintenance(f"Compacted {compacted} old attempts")
+    except Exception as e:
+        log_maintenance(f"Attempt compaction failed: {e}")
+    try:
+        # Cheap and incremental; the one-off conversion runs before the UI (main.py)
+        incremental_vacuum_if_needed()
+    except Exception as e:
+        log_maintenance(f"Vacuum failed: {e}")
+
+if __name__ == "__main__":
+    print(collect_garbage())
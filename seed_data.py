@@ -1,79 +1,87 @@
-import sqlite3
-from database import init_db, get_db_connection
-
-def seed_data():
-    init_db()
-    conn = get_db_connection()
-    c = conn.cursor()
-    
-    # Check if words exist
-    count = c.execute('SELECT count(*) FROM words').fetchone()[0]
-    if count > 0:
-        # Avoid print in frozen app if no console
-        try:
-             print("Database already populated.")
-        except:
-             pass
-        conn.close()
-        return
-
-    # Sample data: 10 words per level for demonstration
-    # In a real scenario, this would load from a massive JSON/CSV
-    
-    # Level 1: Basic
-    level_1 = [
-        ("time", "وقت"), ("year", "سنة"), ("people", "ناس"), ("way", "طريق"), ("day", "يوم"),
-        ("man", "رجل"), ("thing", "شيء"), ("woman", "امرأة"), ("life", "حياة"), ("child", "طفل")
-    ]
-    
-    # Level 2: Elementary
-    level_2 = [
-        ("ask", "يسأل"), ("work", "عمل"), ("seem", "يبدو"), ("feel", "يشعر"), ("try", "يحاول"),
-        ("leave", "يغادر"), ("call", "ينادي"), ("family", "عائلة"), ("school", "مدرسة"), ("plant", "نبات")
-    ]
-
-    # Level 3: Intermediate
-    level_3 = [
-        ("begin", "يبدأ"), ("help", "يساعد"), ("talk", "يتحدث"), ("turn", "يدور"), ("start", "يبدأ"),
-        ("might", "قد"), ("show", "يعرض"), ("hear", "يسمع"), ("play", "يلعب"), ("run", "يجري")
-    ]
-
-    # Level 4: Upper Intermediate
-    level_4 = [
-        ("move", "يتحرك"), ("like", "يحب"), ("live", "يعيش"), ("believe", "يصدق"), ("hold", "يمسك"),
-        ("bring", "يحضر"), ("happen", "يحدث"), ("write", "يكتب"), ("provide", "يزود"), ("sit", "يجلس")
-    ]
-    
-    # Level 5: Advanced
-    level_5 = [
-        ("stand", "يقف"), ("lose", "يخسر"), ("pay", "يدفع"), ("meet", "يقابل"), ("include", "يشمل"),
-        ("continue", "يستمر"), ("set", "يضع"), ("learn", "يتعلم"), ("change", "يغير"), ("leader", "قائد")
-    ]
-    
-    # Level 6: Proficiency
-    level_6 = [
-        ("watch", "يشاهد"), ("follow", "يتبع"), ("stop", "يتوقف"), ("create", "ينشئ"), ("speak", "يتحدث"),
-        ("read", "يقرأ"), ("allow", "يسمح"), ("add", "يضيف"), ("spend", "ينفق"), ("grow", "ينمو")
-    ]
-
-    all_levels = [level_1, level_2, level_3, level_4, level_5, level_6]
-
-    try:
-        print("Seeding data...")
-    except:
-        pass
-        
-    for idx, words in enumerate(all_levels):
-        level_num = idx + 1
-        for en, ar in words:
-            c.execute('INSERT INTO words (level, english_word, arabic_word) VALUES (?, ?, ?)', (level_num, en, ar))
-    
-    conn.commit()
-    try:
-        print(f"Inserted {60} words across 6 levels.")
-    except:
-        pass
-    conn.close()
-
-if __name__ == "__main__":
-    seed_data()
+from database import init_db, get_db_connection, words_are_shared, reserve_local_word_ids
+from vocab_pack import list_packs, iter_pack_rows
+
+def _installed_pack_version(c, name):
+    row = c.execute("SELECT value FROM meta WHERE key = ?", (f"pack:{name}",)).fetchone()
+    return int(row[0]) if row else 0
+
+def install_pack(conn, path, header):
+    """Load one pack in a single transaction. Returns the number of words added.
+
+    On an empty words table every row is bulk-inserted with executemany. Otherwise
+    (pack upgrade, or a database populated before packs existed) the pack is staged
+    in a temp table and only words whose english_word and id are not already present are
+    added. Pack words keep their pack ids.
+    """
+    c = conn.cursor()
+    name = header["name"]
+    has_words = c.execute('SELECT 1 FROM words LIMIT 1').fetchone() is not None
+
+    if not has_words:
+        c.executemany('INSERT INTO words (id, level, english_word, arabic_word) VALUES (?, ?, ?, ?)', iter_pack_rows(path))
+        added = c.rowcount
+    else:
+        c.execute('CREATE TEMP TABLE IF NOT EXISTS pack_words (id INTEGER, level INTEGER, english_word TEXT, arabic_word TEXT)')
+        c.execute('DELETE FROM pack_words')
+        c.executemany('INSERT INTO pack_words VALUES (?, ?, ?, ?)', iter_pack_rows(path))
+        c.execute('CREATE INDEX IF NOT EXISTS temp.idx_pack_words_en ON pack_words(english_word)')
+        # Existing words are matched through a temp copy so the join is indexed on both sides
+        c.execute('CREATE TEMP TABLE IF NOT EXISTS existing_words (english_word TEXT PRIMARY KEY) WITHOUT ROWID')
+        c.execute('DELETE FROM existing_words')
+        c.execute('INSERT OR IGNORE INTO existing_words SELECT english_word FROM words')
+        c.execute('''INSERT INTO words (id, level, english_word, arabic_word)
+                     SELECT p.id, p.level, p.english_word, p.arabic_word
+                     FROM pack_words p
+                     WHERE p.english_word NOT IN (SELECT english_word FROM existing_words)
+                       AND (p.id IS NULL OR p.id NOT IN (SELECT id FROM words))
+                     ORDER BY p.rowid''')
+        added = c.rowcount
+        c.execute('DROP TABLE pack_words')
+        c.execute('DROP TABLE existing_words')
+
+    reserve_local_word_ids(conn)
+    c.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (f"pack:{name}", str(header["version"])))
+    conn.commit()
+    return added
+
+def seed_data():
+    init_db()
+    if words_are_shared():
+        # Words come from the shipped vocabulary file; it's updated by replacing the file
+        return
+    packs = list_packs()
+    if not packs:
+        try:
+            print("No vocabulary packs found.")
+        except:
+            pass
+        return
+
+    conn = get_db_connection()
+    c = conn.cursor()
+    total_added = 0
+    for path, header in packs:
+        # Only the pack header is read when the installed version is current
+        if _installed_pack_version(c, header["name"]) >= header["version"]:
+            continue
+        try:
+            print(f"Installing pack '{header['name']}' v{header['version']}...")
+        except:
+            pass
+        added = install_pack(conn, path, header)
+        total_added += added
+        try:
+            print(f"Added {added} words from pack '{header['name']}'.")
+        except:
+            pass
+    conn.close()
+
+    if total_added:
+        import events
+        events.publish(events.Event(events.WORD_ADDED))
+        # Fresh statistics for the planner after a large first install
+        from maintenance import after_bulk_change
+        after_bulk_change(total_added)
+
+if __name__ == "__main__":
+    seed_data()
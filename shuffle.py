@@ -0,0 +1,51 @@
+import random
+
+# Feistel rounds; 4 is plenty to scramble a study order
+ROUNDS = 4
+_MASK64 = (1 << 64) - 1
+
+def new_seed():
+    """A fresh shuffle seed (fits SQLite's signed 64-bit INTEGER)."""
+    return random.SystemRandom().getrandbits(62)
+
+def _mix(value, key):
+    # splitmix64 finalizer over value ^ key
+    x = ((value ^ key) * 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+class ShuffledOrder:
+    """A seeded bijection of positions 0..size-1, computed on demand.
+
+    A balanced Feistel network permutes the smallest 2^(2k) domain that
+    holds size; values that land outside 0..size-1 are fed through again
+    (cycle walking) until they land inside. order[i] costs a few integer
+    mixes and nothing is stored, so a learner's place in a shuffled level
+    is just (seed, i). The same seed and size always give the same order.
+    """
+
+    def __init__(self, size, seed):
+        self.size = size
+        bits = max(2, (max(size, 2) - 1).bit_length())
+        self._half = (bits + 1) // 2
+        self._mask = (1 << self._half) - 1
+        self._keys = [_mix(seed & _MASK64, r + 1) for r in range(ROUNDS)]
+
+    def _encrypt(self, x):
+        left, right = x >> self._half, x & self._mask
+        for key in self._keys:
+            left, right = right, left ^ (_mix(right, key) & self._mask)
+        return (left << self._half) | right
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.size:
+            raise IndexError("shuffle position out of range")
+        # The domain is under 4x size, so this loops ~4 times at worst on average
+        x = self._encrypt(i)
+        while x >= self.size:
+            x = self._encrypt(x)
+        return x
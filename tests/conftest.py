@@ -0,0 +1,21 @@
+import pytest
+import database
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """database with a fresh progress.db in tmp_path over the shipped vocabulary.db."""
+    # Keep the debug log out of the real home directory
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setattr(database, "_DB_PATH", str(tmp_path / database.DB_NAME))
+    database.init_db()
+    return database
+
+def add_word(db, level, english, arabic="-"):
+    """Insert a word the way an import does (local copy, new id). Returns its id."""
+    conn = db.get_db_connection()
+    db.make_words_writable(conn)
+    word_id = conn.execute('INSERT INTO words (level, english_word, arabic_word) VALUES (?, ?, ?)',
+                           (level, english, arabic)).lastrowid
+    conn.commit()
+    conn.close()
+    return word_id
@@ -0,0 +1,37 @@
+import os
+import time
+import pytest
+import analytics
+import attempt_log
+
+@pytest.fixture
+def far_from_utc():
+    """A local zone 14 hours ahead of UTC, so local and UTC days differ for most attempts."""
+    saved = os.environ.get("TZ")
+    os.environ["TZ"] = "Pacific/Kiritimati"
+    time.tzset()
+    yield
+    if saved is None:
+        del os.environ["TZ"]
+    else:
+        os.environ["TZ"] = saved
+    time.tzset()
+
+def test_rollups_and_compaction_agree_on_the_day(db, far_from_utc):
+    user_id = db.create_user("learner")["id"]
+    word_id = db.get_level_word_ids(1)[0]
+    start = int(time.time()) - 200 * 86400
+    conn = db.get_db_connection()
+    conn.executemany('INSERT INTO attempts (user_id, word_id, correct, latency_ms, ts) VALUES (?, ?, 1, 100, ?)',
+                     [(user_id, word_id, start + hour * 3600) for hour in range(48)])
+    conn.commit()
+    conn.close()
+
+    assert analytics.refresh_rollups() == 48
+    assert attempt_log.compact_attempts() == 48
+
+    conn = db.get_db_connection()
+    rolled = conn.execute('SELECT day, attempts FROM daily_word_stats WHERE word_id = ? ORDER BY day', (word_id,)).fetchall()
+    compacted = conn.execute('SELECT day, attempts FROM attempts_compacted WHERE word_id = ? ORDER BY day', (word_id,)).fetchall()
+    conn.close()
+    assert [tuple(r) for r in compacted] == [tuple(r) for r in rolled]
@@ -0,0 +1,33 @@
+import os
+import backup
+
+def test_backups_in_the_same_instant_get_their_own_files(db, tmp_path, monkeypatch):
+    class FrozenClock(backup.datetime.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2026, 10, 19, 12, 0, 0, 123456)
+    monkeypatch.setattr(backup.datetime, "datetime", FrozenClock)
+    backup_dir = str(tmp_path / "backups")
+    os.makedirs(backup_dir)
+    first = backup.create_backup(backup_dir)
+    second = backup.create_backup(backup_dir)
+    assert first != second
+    assert backup.list_backups(backup_dir) == [second, first]
+    assert backup.verify_backup(first) and backup.verify_backup(second)
+
+def test_rotation_orders_old_and_new_names(tmp_path):
+    names = [
+        "progress-20261018-235959.db",          # written before names had microseconds
+        "progress-20261019-120000.db",
+        "progress-20261019-120000-000001.db",
+        "progress-20261019-120000-000001-1.db",
+        "progress-20261019-120001-000000.db",
+        "progress-manual-copy.db",               # not ours: never listed or pruned
+    ]
+    for name in names:
+        (tmp_path / name).write_bytes(b"")
+    listed = [os.path.basename(p) for p in backup.list_backups(str(tmp_path))]
+    assert listed == names[4::-1]
+    removed = backup.prune_backups(keep=2, backup_dir=str(tmp_path))
+    assert sorted(os.path.basename(p) for p in removed) == sorted(names[:3])
+    assert (tmp_path / "progress-manual-copy.db").exists()
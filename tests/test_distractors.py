@@ -0,0 +1,74 @@
+import pytest
+import distractors
+from database import WordSelection
+
+LEVEL = 1
+
+@pytest.fixture
+def index(db, monkeypatch):
+    # Indexes are module state; start each test with none loaded
+    monkeypatch.setattr(distractors, "_indexes", {})
+    return distractors.get_index(LEVEL)
+
+def check_buckets(index):
+    """Every bucket's ids and positions agree, and each word sits in exactly its buckets."""
+    members = {}
+    for key, bucket in index.buckets.items():
+        assert bucket.ids, key
+        assert {word_id: i for i, word_id in enumerate(bucket.ids)} == bucket.pos
+        for word_id in bucket.ids:
+            members.setdefault(word_id, set()).add(key)
+    assert members == {word_id: set(distractors._keys(english)) for word_id, english in index.english.items()}
+
+def test_built_index_matches_level(db, index):
+    assert set(index.english) == set(db.get_level_word_ids(LEVEL))
+    check_buckets(index)
+
+def test_add_and_remove_keep_buckets_consistent(index):
+    ids = list(index.english)
+    for word_id in ids[:50]:
+        index.remove(word_id)
+    index.remove(ids[0])  # already gone: no-op
+    index.add(ids[50], "renamed")  # re-adding moves it to its new buckets
+    index.add(-1, "zz")
+    check_buckets(index)
+    assert index.english[ids[50]] == "renamed"
+    assert not set(ids[:50]) & set(index.english)
+
+def test_pick_returns_distinct_distractors(index):
+    for english in list(index.english.values())[:200]:
+        picked = index.pick(english, 3)
+        assert len(picked) == 3
+        assert english.lower() not in {p.lower() for p in picked}
+        assert len({p.lower() for p in picked}) == 3
+        assert set(picked) <= set(index.english.values())
+
+def test_pick_in_a_tiny_index(index):
+    for word_id in list(index.english)[2:]:
+        index.remove(word_id)
+    a, b = index.english.values()
+    assert index.pick(a, 3) == [b]
+
+def test_word_events_update_the_index(db, index):
+    ids = list(db.get_level_word_ids(LEVEL))
+    db.delete_word(ids[0])
+    db.update_word(ids[1], "quixotic", "-")
+    db.move_words_to_level(WordSelection.of([ids[2]]), LEVEL + 1)
+    assert ids[0] not in index.english and ids[2] not in index.english
+    assert index.english[ids[1]] == "quixotic"
+    check_buckets(index)
+
+def test_rebuild_replays_events_published_during_the_scan(db, index, monkeypatch):
+    victim = next(iter(index.english))
+    scan = distractors.get_words_by_level
+
+    def scan_then_delete(level):
+        rows = scan(level)
+        db.delete_word(victim)
+        return rows
+
+    monkeypatch.setattr(distractors, "get_words_by_level", scan_then_delete)
+    distractors._rebuild([LEVEL])
+    assert distractors._indexes[LEVEL] is not index
+    assert victim not in distractors._indexes[LEVEL].english
+    assert distractors._replay == []
@@ -0,0 +1,16 @@
+import json
+from exporters import export_dataset
+
+def test_progress_export_keeps_the_shuffle(db, tmp_path):
+    user_id = db.create_user("learner")["id"]
+    size = db.set_shuffle_seed(user_id, 1, 987654321)
+    db.set_level_progress(user_id, 1, 17)
+    db.set_level_progress(user_id, 2, 3)
+    out = str(tmp_path / "progress.jsonl")
+    assert export_dataset("progress", out, username="learner") == 2
+    with open(out, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert rows == [
+        {"username": "learner", "level": 1, "word_index": 17, "shuffle_seed": 987654321, "shuffle_size": size},
+        {"username": "learner", "level": 2, "word_index": 3, "shuffle_seed": None, "shuffle_size": None},
+    ]
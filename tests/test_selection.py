@@ -0,0 +1,65 @@
+from database import WordSelection
+
+LEVEL = 2
+
+def ids_in_level(db, level):
+    conn = db.get_db_connection()
+    ids = [r[0] for r in conn.execute('SELECT id FROM words WHERE level = ? ORDER BY id', (level,))]
+    conn.close()
+    return ids
+
+def selected_ids(db, selection):
+    where, params = selection.where()
+    conn = db.get_db_connection()
+    ids = {r[0] for r in conn.execute(f'SELECT id FROM words WHERE {where}', params)}
+    conn.close()
+    return ids
+
+def test_select_all_with_exclusions(db):
+    in_level = set(ids_in_level(db, LEVEL))
+    excluded = sorted(in_level)[:3] + [sorted(in_level)[-1]]
+    selection = WordSelection(LEVEL)
+    selection.select_all()
+    for word_id in excluded:
+        selection.set(word_id, False)
+    assert selected_ids(db, selection) == in_level - set(excluded)
+    assert selection.count(len(in_level)) == len(in_level) - len(excluded)
+    assert selection.word_ids() is None
+    assert excluded[0] not in selection and sorted(in_level)[5] in selection
+
+def test_reselecting_an_excluded_word(db):
+    in_level = set(ids_in_level(db, LEVEL))
+    word_id = min(in_level)
+    selection = WordSelection(LEVEL)
+    selection.select_all()
+    selection.set(word_id, False)
+    selection.set(word_id, True)
+    assert selected_ids(db, selection) == in_level
+
+def test_exclusions_outside_the_level_are_ignored(db):
+    in_level = set(ids_in_level(db, LEVEL))
+    other = ids_in_level(db, LEVEL + 1)[0]
+    selection = WordSelection(LEVEL)
+    selection.select_all()
+    selection.set(other, False)
+    assert selected_ids(db, selection) == in_level
+
+def test_explicit_ids(db):
+    ids = ids_in_level(db, LEVEL)[10:15]
+    selection = WordSelection(LEVEL)
+    for word_id in ids:
+        selection.set(word_id, True)
+    selection.set(ids[0], False)
+    assert selected_ids(db, selection) == set(ids[1:])
+    assert selection.word_ids() == tuple(sorted(ids[1:]))
+    assert selected_ids(db, WordSelection.of([])) == set()
+
+def test_bulk_delete_keeps_exclusions(db):
+    in_level = sorted(ids_in_level(db, LEVEL))
+    keep = in_level[:2]
+    selection = WordSelection(LEVEL)
+    selection.select_all()
+    for word_id in keep:
+        selection.set(word_id, False)
+    assert db.delete_words_bulk(selection) == len(in_level) - len(keep)
+    assert ids_in_level(db, LEVEL) == keep
@@ -0,0 +1,23 @@
+import pytest
+from shuffle import ShuffledOrder, new_seed
+
+SIZES = list(range(0, 300)) + [1000, 1023, 1024, 1025, 4096, 5003]
+
+@pytest.mark.parametrize("size", SIZES)
+def test_order_is_a_bijection(size):
+    for seed in (0, 1, 0x3FFF_FFFF_FFFF_FFFF):
+        order = ShuffledOrder(size, seed)
+        assert len(order) == size
+        assert sorted(order[i] for i in range(size)) == list(range(size))
+
+def test_same_seed_same_order():
+    seed = new_seed()
+    assert [ShuffledOrder(500, seed)[i] for i in range(500)] == [ShuffledOrder(500, seed)[i] for i in range(500)]
+    assert [ShuffledOrder(500, 1)[i] for i in range(500)] != [ShuffledOrder(500, 2)[i] for i in range(500)]
+
+def test_out_of_range():
+    order = ShuffledOrder(10, 7)
+    with pytest.raises(IndexError):
+        order[10]
+    with pytest.raises(IndexError):
+        order[-1]
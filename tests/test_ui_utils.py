@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from ui_utils import UpdateBatch
+
+class FakePage:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, *controls):
+        self.updates.append(controls)
+
+def test_nested_handlers_flush_once():
+    page = FakePage()
+    ui = UpdateBatch(page)
+
+    @ui.batched
+    def inner():
+        ui.add("b", "a")
+
+    @ui.batched
+    def outer():
+        ui.add("a")
+        inner()
+
+    outer()
+    assert page.updates == [("a", "b")]
+    ui.add("c")  # outside a handler: sent at once
+    assert page.updates[-1] == ("c",)
+
+def test_waiting_handler_does_not_hold_back_others():
+    page = FakePage()
+    ui = UpdateBatch(page)
+    release = asyncio.Event()
+
+    @ui.batched
+    async def slow():
+        ui.add("slow")
+        await release.wait()
+
+    @ui.batched
+    def quick():
+        ui.add("quick")
+
+    @ui.batched
+    async def spawner():
+        # A task started from a handler gets its own batch
+        return asyncio.create_task(slow())
+
+    async def main():
+        task = asyncio.create_task(slow())
+        await asyncio.sleep(0)
+        quick()
+        assert page.updates == [("quick",)]
+        thread = threading.Thread(target=quick)
+        thread.start()
+        thread.join()
+        assert page.updates == [("quick",), ("quick",)]
+        spawned = await spawner()
+        release.set()
+        await task
+        await spawned
+        assert page.updates[2:] == [("slow",), ("slow",)]
+
+    asyncio.run(main())
@@ -0,0 +1,28 @@
+import gzip
+import json
+import sqlite3
+import pytest
+from vocab_pack import write_pack, build_vocab_db
+
+def words(path):
+    conn = sqlite3.connect(path)
+    rows = conn.execute('SELECT id, level, english_word FROM words ORDER BY id').fetchall()
+    conn.close()
+    return rows
+
+def test_build_skips_repeats_within_and_across_packs(tmp_path):
+    first = str(tmp_path / "a.pack.gz")
+    second = str(tmp_path / "b.pack.gz")
+    write_pack(first, [(1, 1, "cat", "-"), (2, 1, "dog", "-"), (2, 1, "dig", "-"), (3, 1, "cat", "-")], "a", 1)
+    write_pack(second, [(1, 2, "cow", "-"), (4, 2, "dog", "-"), (5, 2, "owl", "-"), (5, 2, "ox", "-")], "b", 1)
+    out = str(tmp_path / "vocabulary.db")
+    assert build_vocab_db(out, [first, second]) == 3
+    assert words(out) == [(1, 1, "cat"), (2, 1, "dog"), (5, 2, "owl")]
+
+def test_build_rejects_packs_without_ids(tmp_path):
+    path = str(tmp_path / "old.pack.gz")
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"format": "vocab-pack", "format_version": 1, "name": "old", "version": 1}) + "\n")
+        f.write(json.dumps([1, "cat", "-"]) + "\n")
+    with pytest.raises(ValueError):
+        build_vocab_db(str(tmp_path / "vocabulary.db"), [path])
@@ -0,0 +1,35 @@
+from word_window import WordWindow, ShuffledWordWindow
+from conftest import add_word
+
+LEVEL = 1
+
+def test_word_window_past_end_after_delete(db):
+    window = WordWindow(LEVEL, size=10)
+    total = window.total
+    db.delete_word(db.get_level_word_ids(LEVEL)[-1])
+    assert window.get(total - 1) is None
+    assert window.total == total - 1
+    assert window.get(total - 2) is not None
+
+def test_shuffled_window_deleted_id_reads_none(db):
+    window = ShuffledWordWindow(LEVEL, seed=42, size=10)
+    # A position outside the loaded window, fetched after the delete
+    position = 40
+    deleted = window.ids[window.order[position]]
+    db.delete_word(deleted)
+    assert window.get(position) is None
+    assert window.get(position + 1) is not None
+
+def test_shuffled_order_survives_added_words(db):
+    user_id = db.create_user("learner")["id"]
+    size = db.set_shuffle_seed(user_id, LEVEL, 1234)
+    seed, shuffled_size = db.get_shuffle(user_id, LEVEL)
+    assert (seed, shuffled_size) == (1234, size) and size == db.count_words_in_level(LEVEL)
+    before = ShuffledWordWindow(LEVEL, seed, shuffled_size=shuffled_size)
+    walk = [before.get(i).id for i in range(size)]
+
+    new_id = add_word(db, LEVEL, "zyzzyva")
+    after = ShuffledWordWindow(LEVEL, seed, shuffled_size=shuffled_size)
+    assert after.total == size + 1
+    assert [after.get(i).id for i in range(size)] == walk
+    assert after.get(size).id == new_id
@@ -0,0 +1,101 @@
+import time
+import asyncio
+import functools
+import threading
+import contextvars
+
+def _runner():
+    """The asyncio task running this code, or the thread outside an event loop."""
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return task or threading.get_ident()
+
+class UpdateBatch:
+    """Collects controls changed during an event handler and sends them in one page.update().
+
+    Calling .update() on each control costs one round trip per control in web
+    mode. Handlers wrapped with @batch.batched mark controls dirty with
+    batch.add(...) instead, and everything is flushed together when the
+    outermost wrapped handler returns. Each running handler (asyncio task or
+    worker thread) has its own pending set, so a handler awaiting the
+    database doesn't hold back the others' updates.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        # (task or thread, controls marked dirty) of the handler running in
+        # this context, or None outside one
+        self._batch = contextvars.ContextVar(f"update_batch_{id(self)}", default=None)
+
+    def _current(self):
+        # Tasks started from a handler inherit its context; they get their own batch
+        batch = self._batch.get()
+        return batch[1] if batch is not None and batch[0] == _runner() else None
+
+    def add(self, *controls):
+        dirty = self._current()
+        if dirty is None:
+            # Called outside a batched handler: behave like control.update()
+            self.page.update(*controls)
+            return
+        for c in controls:
+            if not any(c is d for d in dirty):
+                dirty.append(c)
+
+    def focus(self, control):
+        """Queue a focus request for a text field as part of the batch."""
+        if hasattr(control, "_set_attr_json"):
+            # Same attribute TextField.focus() sets, without its own update()
+            control._set_attr_json("focus", str(time.time()))
+            self.add(control)
+        else:
+            control.focus()
+
+    def flush(self):
+        """Send the controls marked so far by the current handler."""
+        dirty = self._current()
+        if not dirty:
+            return
+        controls = list(dirty)
+        dirty.clear()
+        self.page.update(*controls)
+
+    def _begin(self):
+        # Nested wrapped handlers join the outermost one's batch
+        if self._current() is not None:
+            return None
+        return self._batch.set((_runner(), []))
+
+    def _end(self, token):
+        if token is None:
+            return
+        controls = self._batch.get()[1]
+        self._batch.reset(token)
+        if controls:
+            self.page.update(*controls)
+
+    def batched(self, handler):
+        """Decorator: flush all controls marked dirty once the handler finishes.
+
+        Works for both plain and async handlers.
+        """
+        if asyncio.iscoroutinefunction(handler):
+            @functools.wraps(handler)
+            async def async_wrapper(*args, **kwargs):
+                token = self._begin()
+                try:
+                    return await handler(*args, **kwargs)
+                finally:
+                    self._end(token)
+            return async_wrapper
+
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            token = self._begin()
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                self._end(token)
+        return wrapper
@@ -0,0 +1,99 @@
+import weakref
+import threading
+import events
+
+# route -> data topics whose changes make a cached copy of that view stale.
+# Routes not listed here are always rebuilt.
+#   words          - vocabulary added, edited or deleted
+#   progress       - score / position changed while studying
+#   errors         - a word error recorded or cleared
+#   progress_reset - a level restarted from the dashboard
+ROUTE_TOPICS = {
+    "/dashboard": {"words", "progress", "errors", "progress_reset"},
+    # WordsView applies word events to its rows itself
+    "/words": set(),
+    "/learn": {"words", "progress_reset"},
+}
+
+# Topics that concern one user: their events carry user_id and only drop
+# views built for that user (other sessions' dashboards are still right)
+USER_TOPICS = {"progress", "errors", "progress_reset"}
+
+# Data-layer event type -> topic
+EVENT_TOPICS = {
+    events.WORD_ADDED: "words",
+    events.WORD_UPDATED: "words",
+    events.WORD_DELETED: "words",
+    events.PROGRESS_CHANGED: "progress",
+    events.PROGRESS_RESET: "progress_reset",
+    events.ERROR_RECORDED: "errors",
+    events.ERROR_CLEARED: "errors",
+}
+
+# Every live cache (one per page/session), so a change made in one session
+# also invalidates the others
+_caches = weakref.WeakSet()
+
+class ViewCache:
+    """Built ft.View instances per route, reused across route changes until invalidated.
+
+    Each entry remembers the key it was built for (e.g. username and level);
+    a different key rebuilds; an entry built with a user_id is only dropped
+    by progress and error changes of that user. The keyboard handler a view
+    installs while being built is restored whenever the cached view is shown
+    again.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self._entries = {}  # route -> (key, view, keyboard handler or None, user_id)
+        # Invalidation arrives on DB worker threads
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def get(self, route, build, key=None, user_id=None):
+        with self._lock:
+            entry = self._entries.get(route)
+        if entry and entry[0] == key:
+            if entry[2] is not None:
+                self.page.on_keyboard_event = entry[2]
+            return entry[1]
+
+        before = getattr(self.page, "on_keyboard_event", None)
+        view = build()
+        handler = getattr(self.page, "on_keyboard_event", None)
+        if route in ROUTE_TOPICS:
+            with self._lock:
+                self._entries[route] = (key, view, handler if handler is not before else None, user_id)
+        return view
+
+    def invalidate(self, route=None):
+        with self._lock:
+            if route is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(route, None)
+
+    def invalidate_topics(self, topics, user_id=None):
+        """Drop entries depending on any of `topics`; with user_id, user topics only drop that user's entries."""
+        with self._lock:
+            for route, entry in list(self._entries.items()):
+                stale = ROUTE_TOPICS.get(route, set()) & topics
+                if stale and user_id is not None and entry[3] is not None and entry[3] != user_id:
+                    stale -= USER_TOPICS
+                if stale:
+                    del self._entries[route]
+
+def invalidate_for(*topics, user_id=None):
+    """Drop cached views (in every session) that depend on any of the given topics.
+
+    Pass the user_id of a progress/error change to keep other users' views.
+    """
+    topics = set(topics)
+    for cache in list(_caches):
+        cache.invalidate_topics(topics, user_id)
+
+def _on_data_event(event):
+    invalidate_for(EVENT_TOPICS[event.type], user_id=event.user_id)
+
+events.subscribe(_on_data_event, *EVENT_TOPICS)
@@ -0,0 +1,82 @@
+import flet as ft
+from database import get_user_id
+import leaderboard
+import async_db
+
+def LeaderboardView(page: ft.Page):
+    from session_utils import get_session
+    username = get_session(page, "username")
+    user_id = get_session(page, "user_id") or get_user_id(username)
+
+    rows_column = ft.Column(spacing=6, scroll=ft.ScrollMode.AUTO, expand=True)
+    my_rank_text = ft.Text("", size=16, color="greenAccent")
+
+    def leaderboard_row(rank, name, score, is_me):
+        medal = {1: "🥇", 2: "🥈", 3: "🥉"}.get(rank, f"#{rank}")
+        return ft.Container(
+            content=ft.Row(
+                [
+                    ft.Text(medal, size=18, width=50, color="white"),
+                    ft.Text(name, size=18, expand=True, color="white", weight=ft.FontWeight.BOLD if is_me else None),
+                    ft.Text(str(score), size=18, color="amber"),
+                ],
+            ),
+            bgcolor=ft.Colors.BLUE_GREY_700 if is_me else ft.Colors.BLUE_GREY_900,
+            border_radius=10,
+            padding=ft.Padding(left=15, right=15, top=10, bottom=10),
+        )
+
+    def render(top, mine):
+        rows_column.controls = []
+        rank = 0
+        previous = None
+        for i, (uid, name, score) in enumerate(top):
+            # Equal scores share a rank, matching get_user_rank()
+            if score != previous:
+                rank = i + 1
+                previous = score
+            rows_column.controls.append(leaderboard_row(rank, name, score, uid == user_id))
+        if mine:
+            my_rank_text.value = f"Your rank: #{mine[0]} • {mine[1]} points"
+        else:
+            my_rank_text.value = ""
+
+    render(leaderboard.get_top(), leaderboard.get_rank(user_id) if user_id else None)
+
+    async def refresh(e):
+        top = await async_db.run_blocking(leaderboard.get_top)
+        mine = await async_db.run_blocking(leaderboard.get_rank, user_id) if user_id else None
+        render(top, mine)
+        page.update(rows_column, my_rank_text)
+
+    return ft.View(
+        route="/leaderboard",
+        controls=[
+            ft.Container(
+                content=ft.Column(
+                    [
+                        ft.Row(
+                            [
+                                ft.IconButton(ft.Icons.ARROW_BACK, icon_color="white", on_click=lambda e: page.go("/dashboard")),
+                                ft.Text("Leaderboard", size=24, weight=ft.FontWeight.BOLD, color="white"),
+                                ft.IconButton(ft.Icons.REFRESH, icon_color="white", tooltip="Refresh", on_click=refresh),
+                            ],
+                        ),
+                        my_rank_text,
+                        ft.Container(height=15),
+                        rows_column,
+                    ],
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                    expand=True,
+                ),
+                padding=40,
+                expand=True,
+                gradient=ft.LinearGradient(
+                    begin=ft.Alignment(0, -1),
+                    end=ft.Alignment(0, 1),
+                    colors=[ft.Colors.BLUE_GREY_900, ft.Colors.BLACK],
+                )
+            )
+        ],
+        padding=0,
+    )
@@ -1,214 +1,357 @@
-import flet as ft
-from database import get_user, get_words_by_level, update_user_progress, get_level_progress, set_level_progress, increment_word_error
-import os
-from gtts import gTTS
-import tempfile
-
-def LearningView(page: ft.Page):
-    from session_utils import get_session
-    username = get_session(page, "username")
-    user = get_user(username)
-    
-    current_level = get_session(page, "current_level") or user['current_level']
-    
-    # Load words
-    all_words = get_words_by_level(current_level)
-    
-    if not all_words:
-        return ft.View(route="/learn", controls=[ft.Text("No words found for this level.")])
-
-    # Get per-level progress
-    saved_index = get_level_progress(username, current_level)
-    
-    # Mutable state
-    state = {
-        "index": saved_index,
-        "answered": False
-    }
-    
-    if state["index"] >= len(all_words):
-        state["index"] = 0
-
-    # --- UI Controls ---
-    arabic_text = ft.Text(
-        all_words[state["index"]]['arabic_word'],
-        size=40,
-        weight=ft.FontWeight.BOLD,
-        color="white",
-    )
-    
-    word_counter = ft.Text(
-        f"Level {current_level} - Word {state['index'] + 1}/{len(all_words)}", 
-        color="white"
-    )
-    
-    answer_field = ft.TextField(
-        label="Type in English",
-        border_color="white",
-        color="white",
-        text_align=ft.TextAlign.CENTER,
-        width=300,
-        autofocus=True,
-    )
-    
-    feedback_text = ft.Text("", size=20)
-    reveal_text = ft.Text("", size=22, color="amber", weight=ft.FontWeight.BOLD, visible=False)
-    
-    progress_bar = ft.ProgressBar(
-        width=300,
-        value=(state["index"] + 1) / len(all_words),
-        color="green",
-        bgcolor="white24"
-    )
-
-    # --- Functions ---
-    def load_word():
-        """Update all UI controls to show the current word."""
-        word = all_words[state["index"]]
-        arabic_text.value = word['arabic_word']
-        arabic_text.update()
-        word_counter.value = f"Level {current_level} - Word {state['index'] + 1}/{len(all_words)}"
-        word_counter.update()
-        progress_bar.value = (state["index"] + 1) / len(all_words)
-        progress_bar.update()
-        answer_field.value = ""
-        answer_field.color = "white"
-        answer_field.update()
-        answer_field.focus()
-        feedback_text.value = ""
-        feedback_text.update()
-        reveal_text.value = ""
-        reveal_text.visible = False
-        reveal_text.update()
-
-    def show_word():
-        word = all_words[state["index"]]
-        reveal_text.value = word['english_word']
-        reveal_text.visible = True
-        reveal_text.update()
-
-    def play_audio(e):
-        word = all_words[state["index"]]
-        text = word['english_word']
-        try:
-            import time
-            fname = f"tts_{current_level}_{word['id']}_{int(time.time())}.mp3"
-            fpath = os.path.join(tempfile.gettempdir(), fname)
-            
-            tts = gTTS(text, lang='en')
-            tts.save(fpath)
-            
-            new_player = ft.Audio(src=fpath, autoplay=True)
-            page.overlay.append(new_player)
-            page.update()
-        except Exception as ex:
-            print(f"Audio error: {ex}")
-            page.snack_bar = ft.SnackBar(ft.Text(f"Audio error: {ex}"))
-            page.snack_bar.open = True
-            page.update()
-
-    def check_answer(e):
-        if state["answered"]:
-            # Second Enter: advance to next word
-            new_index = state["index"] + 1
-            update_user_progress(username, current_level, new_index, score_increment=10)
-            set_level_progress(username, current_level, new_index)
-            
-            if new_index >= len(all_words):
-                # Level complete!
-                feedback_text.value = "🎉 Level Complete!"
-                feedback_text.color = "yellow"
-                feedback_text.update()
-                return
-            
-            state["index"] = new_index
-            state["answered"] = False
-            load_word()
-            return
-
-        word = all_words[state["index"]]
-        user_input = answer_field.value.strip().lower()
-        correct_answer = word['english_word'].lower()
-        
-        if user_input == correct_answer:
-            state["answered"] = True
-            feedback_text.value = "Correct! ✅  Press Enter to continue"
-            feedback_text.color = "green"
-            feedback_text.update()
-            answer_field.color = "green"
-            answer_field.update()
-            answer_field.focus()
-        else:
-            feedback_text.value = "❌ Try Again"
-            feedback_text.color = "red"
-            feedback_text.update()
-            answer_field.focus()
-            # Track error
-            increment_word_error(username, word['id'])
-
-    answer_field.on_submit = check_answer
-
-    def on_keyboard(e: ft.KeyboardEvent):
-        if e.key == "\\":
-            play_audio(None)
-
-    page.on_keyboard_event = on_keyboard
-
-    return ft.View(
-        route="/learn",
-        controls=[
-            ft.Container(
-                content=ft.Column(
-                    [
-                        ft.Row(
-                            [
-                                ft.IconButton(ft.Icons.ARROW_BACK, icon_color="white", on_click=lambda e: page.go("/dashboard")),
-                                word_counter
-                            ],
-                            alignment=ft.MainAxisAlignment.SPACE_BETWEEN
-                        ),
-                        ft.Container(height=40),
-                        ft.Text("Translate this word:", color="white70"),
-                        arabic_text,
-                        ft.Container(height=20),
-                        ft.Row(
-                            [
-                                ft.IconButton(
-                                    icon=ft.Icons.VOLUME_UP_ROUNDED,
-                                    icon_size=40,
-                                    icon_color="cyanAccent",
-                                    on_click=play_audio,
-                                    tooltip="Listen (or press \\)"
-                                ),
-                                ft.IconButton(
-                                    icon=ft.Icons.VISIBILITY,
-                                    icon_size=40,
-                                    icon_color="amber",
-                                    on_click=lambda e: show_word(),
-                                    tooltip="Show English word"
-                                ),
-                            ],
-                            alignment=ft.MainAxisAlignment.CENTER,
-                            spacing=10,
-                        ),
-                        reveal_text,
-                        ft.Container(height=20),
-                        answer_field,
-                        ft.Container(height=20),
-                        feedback_text,
-                        ft.Container(height=40),
-                        progress_bar,
-                    ],
-                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                ),
-                padding=40,
-                expand=True,
-                gradient=ft.LinearGradient(
-                    begin=ft.Alignment(0, -1),
-                    end=ft.Alignment(0, 1),
-                    colors=[ft.Colors.DEEP_PURPLE_900, ft.Colors.BLACK],
-                )
-            )
-        ],
-        padding=0
-    )
+import time
+import flet as ft
+from database import get_user, get_level_progress, get_shuffle
+from word_window import WordWindow, ShuffledWordWindow
+from shuffle import new_seed
+import distractors
+from ui_utils import UpdateBatch
+import async_db
+from audio_service import synthesize_async
+from attempt_log import record_attempt
+
+def LearningView(page: ft.Page):
+    from session_utils import get_session, set_session
+    username = get_session(page, "username")
+    user = get_user(username)
+    user_id = user['id']
+    
+    current_level = get_session(page, "current_level") or user['current_level']
+    
+    # Get per-level progress
+    saved_index = get_level_progress(user_id, current_level)
+
+    # Shuffled levels keep only a seed; the order is recomputed from it
+    seed, shuffled_size = get_shuffle(user_id, current_level)
+
+    def open_window(start_index):
+        # Load only a window of words around the saved position
+        if seed is None:
+            return WordWindow(current_level, start_index)
+        return ShuffledWordWindow(current_level, seed, start_index, shuffled_size=shuffled_size)
+
+    window = open_window(saved_index)
+    
+    if not window.total:
+        return ft.View(route="/learn", controls=[ft.Text("No words found for this level.")])
+    
+    # Mutable state
+    state = {
+        "index": saved_index,
+        "answered": False,
+        # When the current word (or the last wrong answer) was shown, for attempt latency
+        "shown_at": time.monotonic()
+    }
+    
+    if state["index"] >= window.total:
+        state["index"] = 0
+
+    def current_word():
+        """The word at the learner's position, or None once past the end of the level.
+
+        Words can be deleted while a level is open (Word Manager, another
+        session); the windows return None for them, so move on to the next one.
+        """
+        word = window.get(state["index"])
+        while word is None and state["index"] + 1 < window.total:
+            state["index"] += 1
+            word = window.get(state["index"])
+        return word
+
+    first_word = current_word()
+    if first_word is None:
+        return ft.View(route="/learn", controls=[ft.Text("No words found for this level.")])
+
+    # Multiple choice instead of typing; distractors come from a per-level index built once
+    multiple_choice = bool(get_session(page, "multiple_choice"))
+    if multiple_choice:
+        distractors.get_index(current_level)
+
+    # --- UI Controls ---
+    arabic_text = ft.Text(
+        first_word['arabic_word'],
+        size=40,
+        weight=ft.FontWeight.BOLD,
+        color="white",
+    )
+    
+    word_counter = ft.Text(
+        f"Level {current_level} - Word {state['index'] + 1}/{window.total}", 
+        color="white"
+    )
+    
+    answer_field = ft.TextField(
+        label="Type in English",
+        border_color="white",
+        color="white",
+        text_align=ft.TextAlign.CENTER,
+        width=300,
+        autofocus=True,
+        visible=not multiple_choice,
+    )
+
+    choice_buttons = [
+        ft.ElevatedButton("", width=300, bgcolor=ft.Colors.WHITE10, color="white")
+        for _ in range(distractors.CHOICES)
+    ]
+    choices_column = ft.Column(choice_buttons, spacing=8, visible=multiple_choice,
+                               horizontal_alignment=ft.CrossAxisAlignment.CENTER)
+    
+    feedback_text = ft.Text("", size=20)
+    mode_btn = ft.IconButton(
+        icon=ft.Icons.QUIZ,
+        icon_color="cyanAccent" if multiple_choice else "white54",
+        tooltip="Type the answer" if multiple_choice else "Multiple choice",
+    )
+    shuffle_btn = ft.IconButton(
+        icon=ft.Icons.SHUFFLE,
+        icon_color="cyanAccent" if seed is not None else "white54",
+        tooltip="Shuffled order (restarts the level)" if seed is None else "Back to list order (restarts the level)",
+    )
+    reveal_text = ft.Text("", size=22, color="amber", weight=ft.FontWeight.BOLD, visible=False)
+    
+    progress_bar = ft.ProgressBar(
+        width=300,
+        value=(state["index"] + 1) / window.total,
+        color="green",
+        bgcolor="white24"
+    )
+
+    # Controls changed by a handler are sent in one page.update()
+    ui = UpdateBatch(page)
+
+    # --- Functions ---
+    @ui.batched
+    def load_word():
+        """Update all UI controls to show the current word."""
+        word = current_word()
+        if word is None:
+            show_level_complete()
+            return
+        arabic_text.value = word['arabic_word']
+        ui.add(arabic_text)
+        word_counter.value = f"Level {current_level} - Word {state['index'] + 1}/{window.total}"
+        ui.add(word_counter)
+        progress_bar.value = (state["index"] + 1) / window.total
+        ui.add(progress_bar)
+        answer_field.value = ""
+        answer_field.color = "white"
+        ui.add(answer_field)
+        ui.focus(answer_field)
+        feedback_text.value = ""
+        ui.add(feedback_text)
+        reveal_text.value = ""
+        reveal_text.visible = False
+        ui.add(reveal_text)
+        if multiple_choice:
+            set_choices(word)
+        state["shown_at"] = time.monotonic()
+
+    def set_choices(word):
+        choices = distractors.get_choices(word)
+        for btn, choice in zip(choice_buttons, choices + [None] * len(choice_buttons)):
+            btn.text = btn.data = choice
+            btn.visible = choice is not None
+            btn.bgcolor = ft.Colors.WHITE10
+        ui.add(choices_column)
+
+    @ui.batched
+    def show_word():
+        word = current_word()
+        if word is None:
+            return
+        reveal_text.value = word['english_word']
+        reveal_text.visible = True
+        ui.add(reveal_text)
+
+    async def play_audio(e):
+        word = current_word()
+        if word is None:
+            return
+        text = word['english_word']
+        try:
+            # Synthesis (network) runs on the executor, not the event loop
+            fpath = await synthesize_async(text)
+            
+            new_player = ft.Audio(src=fpath, autoplay=True)
+            page.overlay.append(new_player)
+            page.update()
+        except Exception as ex:
+            print(f"Audio error: {ex}")
+            page.snack_bar = ft.SnackBar(ft.Text(f"Audio error: {ex}"))
+            page.snack_bar.open = True
+            page.update()
+
+    async def advance():
+        new_index = state["index"] + 1
+        if new_index < window.total:
+            # Claim the move before awaiting so a repeated Enter can't advance twice
+            state["index"] = new_index
+            state["answered"] = False
+        await async_db.update_user_progress(user_id, current_level, new_index, score_increment=10)
+        await async_db.set_level_progress(user_id, current_level, new_index)
+        
+        if new_index >= window.total:
+            show_level_complete()
+            return
+        
+        load_word()
+
+    def show_level_complete():
+        feedback_text.value = "🎉 Level Complete!"
+        feedback_text.color = "yellow"
+        ui.add(feedback_text)
+
+    async def grade(user_input):
+        """Record an attempt at the current word; True if it was right."""
+        word = current_word()
+        if word is None:
+            show_level_complete()
+            return False
+        correct = user_input.strip().lower() == word['english_word'].lower()
+        latency_ms = int((time.monotonic() - state["shown_at"]) * 1000)
+        state["shown_at"] = time.monotonic()
+        record_attempt(user_id, word['id'], correct, latency_ms)
+        if correct:
+            state["answered"] = True
+        else:
+            feedback_text.value = "❌ Try Again"
+            feedback_text.color = "red"
+            ui.add(feedback_text)
+            # Track error
+            await async_db.increment_word_error(user_id, word['id'])
+        return correct
+
+    @ui.batched
+    async def check_answer(e):
+        if state["answered"]:
+            # Second Enter: advance to next word
+            await advance()
+            return
+
+        if await grade(answer_field.value):
+            feedback_text.value = "Correct! ✅  Press Enter to continue"
+            feedback_text.color = "green"
+            ui.add(feedback_text)
+            answer_field.color = "green"
+            ui.add(answer_field)
+        ui.focus(answer_field)
+
+    answer_field.on_submit = check_answer
+
+    @ui.batched
+    async def on_choice(e):
+        if state["answered"]:
+            # Any choice after the right one moves on
+            await advance()
+            return
+        correct = await grade(e.control.data)
+        e.control.bgcolor = ft.Colors.GREEN_700 if correct else ft.Colors.RED_900
+        ui.add(e.control)
+        if correct:
+            feedback_text.value = "Correct! ✅  Tap any answer to continue"
+            feedback_text.color = "green"
+            ui.add(feedback_text)
+
+    for btn in choice_buttons:
+        btn.on_click = on_choice
+
+    @ui.batched
+    async def toggle_mode(e):
+        nonlocal multiple_choice
+        multiple_choice = not multiple_choice
+        set_session(page, "multiple_choice", multiple_choice)
+        if multiple_choice:
+            # First use of a level scans it once; keep that off the event loop
+            await async_db.run_blocking(distractors.get_index, current_level)
+            word = current_word()
+            if word is not None:
+                set_choices(word)
+        answer_field.visible = not multiple_choice
+        choices_column.visible = multiple_choice
+        mode_btn.icon_color = "cyanAccent" if multiple_choice else "white54"
+        mode_btn.tooltip = "Type the answer" if multiple_choice else "Multiple choice"
+        ui.add(answer_field, choices_column, mode_btn)
+
+    mode_btn.on_click = toggle_mode
+
+    @ui.batched
+    async def toggle_shuffle(e):
+        nonlocal seed, shuffled_size, window
+        seed = new_seed() if seed is None else None
+        shuffled_size = await async_db.set_shuffle_seed(user_id, current_level, seed)
+        window = await async_db.run_blocking(open_window, 0)
+        state["index"] = 0
+        state["answered"] = False
+        shuffle_btn.icon_color = "cyanAccent" if seed is not None else "white54"
+        shuffle_btn.tooltip = "Shuffled order (restarts the level)" if seed is None else "Back to list order (restarts the level)"
+        ui.add(shuffle_btn)
+        load_word()
+
+    shuffle_btn.on_click = toggle_shuffle
+
+    async def on_keyboard(e: ft.KeyboardEvent):
+        if e.key == "\\":
+            await play_audio(None)
+
+    page.on_keyboard_event = on_keyboard
+
+    return ft.View(
+        route="/learn",
+        controls=[
+            ft.Container(
+                content=ft.Column(
+                    [
+                        ft.Row(
+                            [
+                                ft.IconButton(ft.Icons.ARROW_BACK, icon_color="white", on_click=lambda e: page.go("/dashboard")),
+                                word_counter,
+                                ft.Row([mode_btn, shuffle_btn], spacing=0),
+                            ],
+                            alignment=ft.MainAxisAlignment.SPACE_BETWEEN
+                        ),
+                        ft.Container(height=40),
+                        ft.Text("Translate this word:", color="white70"),
+                        arabic_text,
+                        ft.Container(height=20),
+                        ft.Row(
+                            [
+                                ft.IconButton(
+                                    icon=ft.Icons.VOLUME_UP_ROUNDED,
+                                    icon_size=40,
+                                    icon_color="cyanAccent",
+                                    on_click=play_audio,
+                                    tooltip="Listen (or press \\)"
+                                ),
+                                ft.IconButton(
+                                    icon=ft.Icons.VISIBILITY,
+                                    icon_size=40,
+                                    icon_color="amber",
+                                    on_click=lambda e: show_word(),
+                                    tooltip="Show English word"
+                                ),
+                            ],
+                            alignment=ft.MainAxisAlignment.CENTER,
+                            spacing=10,
+                        ),
+                        reveal_text,
+                        ft.Container(height=20),
+                        answer_field,
+                        choices_column,
+                        ft.Container(height=20),
+                        feedback_text,
+                        ft.Container(height=40),
+                        progress_bar,
+                    ],
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                ),
+                padding=40,
+                expand=True,
+                gradient=ft.LinearGradient(
+                    begin=ft.Alignment(0, -1),
+                    end=ft.Alignment(0, 1),
+                    colors=[ft.Colors.DEEP_PURPLE_900, ft.Colors.BLACK],
+                )
+            )
+        ],
+        padding=0
+    )
@@ -1,215 +1,419 @@
-import flet as ft
-from database import get_words_by_level, delete_word, delete_words_bulk, update_word
-
-def WordsView(page: ft.Page):
-    # State
-    state = {
-        "current_level": 1,
-        "selected_ids": set(),
-    }
-
-    # --- UI Controls ---
-    words_list = ft.ListView(expand=True, spacing=2, padding=10)
-    select_all_checkbox = ft.Checkbox(label="Select All", value=False)
-    delete_btn = ft.ElevatedButton(
-        "Delete Selected",
-        icon=ft.Icons.DELETE,
-        bgcolor=ft.Colors.RED_900,
-        color="white",
-        visible=False,
-    )
-    word_count_text = ft.Text("", color="white70", size=14)
-
-    # --- Functions ---
-    def load_words(is_initial=False):
-        words = get_words_by_level(state["current_level"])
-        state["selected_ids"].clear()
-        select_all_checkbox.value = False
-
-        words_list.controls.clear()
-        for w in words:
-            cb = ft.Checkbox(
-                value=False,
-                data=w['id'],
-                on_change=on_word_checked
-            )
-            row = ft.Container(
-                content=ft.Row(
-                    [
-                        cb,
-                        ft.Text(w['english_word'], size=16, color="white", width=150, weight=ft.FontWeight.W_500),
-                        ft.Text(w['arabic_word'], size=16, color="cyanAccent", width=150),
-                        ft.IconButton(
-                            ft.Icons.EDIT,
-                            icon_color="amber",
-                            icon_size=20,
-                            data=w,
-                            on_click=lambda e: open_edit_dialog(e.control.data),
-                            tooltip="Edit"
-                        ),
-                        ft.IconButton(
-                            ft.Icons.DELETE_OUTLINE,
-                            icon_color="red",
-                            icon_size=20,
-                            data=w['id'],
-                            on_click=lambda e: confirm_delete_single(e.control.data),
-                            tooltip="Delete"
-                        ),
-                    ],
-                    alignment=ft.MainAxisAlignment.START,
-                ),
-                bgcolor=ft.Colors.WHITE10,
-                border_radius=8,
-                padding=ft.Padding(left=10, right=10, top=4, bottom=4),
-            )
-            words_list.controls.append(row)
-
-        word_count_text.value = f"{len(words)} words in Level {state['current_level']}"
-        delete_btn.visible = False
-        
-        if not is_initial:
-            select_all_checkbox.update()
-            word_count_text.update()
-            delete_btn.update()
-            words_list.update()
-
-    def on_word_checked(e):
-        word_id = e.control.data
-        if e.control.value:
-            state["selected_ids"].add(word_id)
-        else:
-            state["selected_ids"].discard(word_id)
-        update_delete_btn_visibility()
-
-    def update_delete_btn_visibility():
-        delete_btn.visible = len(state["selected_ids"]) > 0
-        if state["selected_ids"]:
-            delete_btn.text = f"Delete Selected ({len(state['selected_ids'])})"
-        delete_btn.update()
-
-    def on_select_all(e):
-        words = get_words_by_level(state["current_level"])
-        state["selected_ids"].clear()
-        if e.control.value:
-            for w in words:
-                state["selected_ids"].add(w['id'])
-        # Update all checkboxes in the list
-        for row_container in words_list.controls:
-            cb = row_container.content.controls[0]  # First control is Checkbox
-            cb.value = e.control.value
-        words_list.update()
-        update_delete_btn_visibility()
-
-    select_all_checkbox.on_change = on_select_all
-
-    def confirm_delete_single(word_id):
-        def do_delete(e):
-            delete_word(word_id)
-            page.close(dlg)
-            load_words()
-
-        dlg = ft.AlertDialog(
-            title=ft.Text("Delete Word"),
-            content=ft.Text("Are you sure you want to delete this word?"),
-            actions=[
-                ft.TextButton("Cancel", on_click=lambda e: page.close(dlg)),
-                ft.TextButton("Delete", on_click=do_delete),
-            ],
-        )
-        page.open(dlg)
-        page.update()
-
-    def confirm_delete_bulk(e):
-        count = len(state["selected_ids"])
-        def do_delete(e):
-            delete_words_bulk(list(state["selected_ids"]))
-            page.close(dlg)
-            load_words()
-
-        dlg = ft.AlertDialog(
-            title=ft.Text("Delete Words"),
-            content=ft.Text(f"Are you sure you want to delete {count} selected words?"),
-            actions=[
-                ft.TextButton("Cancel", on_click=lambda e: page.close(dlg)),
-                ft.TextButton("Delete All", on_click=do_delete),
-            ],
-        )
-        page.open(dlg)
-        page.update()
-
-    delete_btn.on_click = confirm_delete_bulk
-
-    def open_edit_dialog(word_data):
-        en_field = ft.TextField(value=word_data['english_word'], label="English", width=250)
-        ar_field = ft.TextField(value=word_data['arabic_word'], label="Arabic", width=250)
-
-        def save_edit(e):
-            update_word(word_data['id'], en_field.value.strip(), ar_field.value.strip())
-            page.close(dlg)
-            load_words()
-
-        dlg = ft.AlertDialog(
-            title=ft.Text("Edit Word"),
-            content=ft.Column([en_field, ar_field], tight=True, spacing=10),
-            actions=[
-                ft.TextButton("Cancel", on_click=lambda e: page.close(dlg)),
-                ft.TextButton("Save", on_click=save_edit),
-            ],
-        )
-        page.open(dlg)
-        page.update()
-
-    def on_level_tab_change(e):
-        state["current_level"] = e.control.selected_index + 1
-        load_words()
-
-    # --- Level Tabs ---
-    level_tabs = ft.Tabs(
-        selected_index=0,
-        on_change=on_level_tab_change,
-        tabs=[ft.Tab(text=f"Level {i}") for i in range(1, 7)],
-        indicator_color="cyanAccent",
-        label_color="white",
-        unselected_label_color="white54",
-    )
-
-    # Load initial data (no .update() calls since controls aren't on page yet)
-    load_words(is_initial=True)
-
-    return ft.View(
-        route="/words",
-        controls=[
-            ft.Container(
-                content=ft.Column(
-                    [
-                        ft.Row(
-                            [
-                                ft.IconButton(ft.Icons.ARROW_BACK, icon_color="white", on_click=lambda e: page.go("/dashboard")),
-                                ft.Text("Word Manager", size=24, weight=ft.FontWeight.BOLD, color="white"),
-                            ],
-                        ),
-                        level_tabs,
-                        ft.Container(height=10),
-                        ft.Row(
-                            [
-                                select_all_checkbox,
-                                word_count_text,
-                                delete_btn,
-                            ],
-                            alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                        ),
-                        ft.Container(height=5),
-                        words_list,
-                    ],
-                ),
-                padding=20,
-                expand=True,
-                gradient=ft.LinearGradient(
-                    begin=ft.Alignment(0, -1),
-                    end=ft.Alignment(0, 1),
-                    colors=[ft.Colors.BLUE_GREY_900, ft.Colors.BLACK],
-                )
-            )
-        ],
-        padding=0,
-    )
+import flet as ft
+from database import get_words_page, count_words_in_level, WordSelection
+from ui_utils import UpdateBatch
+import async_db
+import events
+from maintenance import after_bulk_change
+
+def WordsView(page: ft.Page):
+    # State
+    state = {
+        "current_level": 1,
+        # "These ids" or "all in the level except these"; resolved in SQL by bulk actions
+        "selection": WordSelection(1),
+        # word id -> (row, english Text, arabic Text, edit button) for in-place updates
+        "rows": {},
+        "total": 0,
+    }
+
+    # Rows rendered per "Load more"; a level can hold far more words than a list should show
+    PAGE_SIZE = 200
+
+    # --- UI Controls ---
+    words_list = ft.ListView(expand=True, spacing=2, padding=10)
+    select_all_checkbox = ft.Checkbox(label="Select All", value=False)
+    delete_btn = ft.ElevatedButton(
+        "Delete Selected",
+        icon=ft.Icons.DELETE,
+        bgcolor=ft.Colors.RED_900,
+        color="white",
+        visible=False,
+    )
+    word_count_text = ft.Text("", color="white70", size=14)
+    load_more_btn = ft.TextButton("Load more", icon=ft.Icons.EXPAND_MORE, visible=False)
+    bulk_menu = ft.PopupMenuButton(
+        icon=ft.Icons.EDIT_NOTE,
+        icon_color="amber",
+        tooltip="Edit Selected",
+        visible=False,
+    )
+
+    # Editing more rows than this in one dialog gets unwieldy
+    MULTI_EDIT_MAX = 50
+
+    # Controls changed by a handler are sent in one page.update()
+    ui = UpdateBatch(page)
+
+    # --- Functions ---
+    def make_row(w):
+        cb = ft.Checkbox(
+            value=w['id'] in state["selection"],
+            data=w['id'],
+            on_change=on_word_checked
+        )
+        en_text = ft.Text(w['english_word'], size=16, color="white", width=150, weight=ft.FontWeight.W_500)
+        ar_text = ft.Text(w['arabic_word'], size=16, color="cyanAccent", width=150)
+        edit_btn = ft.IconButton(
+            ft.Icons.EDIT,
+            icon_color="amber",
+            icon_size=20,
+            data=w,
+            on_click=lambda e: open_edit_dialog(e.control.data),
+            tooltip="Edit"
+        )
+        row = ft.Container(
+            content=ft.Row(
+                [
+                    cb,
+                    en_text,
+                    ar_text,
+                    edit_btn,
+                    ft.IconButton(
+                        ft.Icons.DELETE_OUTLINE,
+                        icon_color="red",
+                        icon_size=20,
+                        data=w['id'],
+                        on_click=lambda e: confirm_delete_single(e.control.data),
+                        tooltip="Delete"
+                    ),
+                ],
+                alignment=ft.MainAxisAlignment.START,
+            ),
+            bgcolor=ft.Colors.WHITE10,
+            border_radius=8,
+            padding=ft.Padding(left=10, right=10, top=4, bottom=4),
+        )
+        state["rows"][w['id']] = (row, en_text, ar_text, edit_btn)
+        return row
+
+    def set_counts():
+        word_count_text.value = f"{state['total']} words in Level {state['current_level']}"
+        load_more_btn.visible = len(state["rows"]) < state["total"]
+        load_more_btn.text = f"Load more ({len(state['rows'])} of {state['total']} shown)"
+
+    @ui.batched
+    def render_words(words, total, is_initial=False):
+        state["selection"] = WordSelection(state["current_level"])
+        select_all_checkbox.value = False
+
+        words_list.controls.clear()
+        state["rows"].clear()
+        words_list.controls.extend(make_row(w) for w in words)
+        state["total"] = total
+        set_counts()
+        delete_btn.visible = bulk_menu.visible = False
+        
+        if not is_initial:
+            ui.add(select_all_checkbox, word_count_text, delete_btn, bulk_menu, words_list, load_more_btn)
+
+    async def load_words():
+        level = state["current_level"]
+        render_words(await async_db.get_words_page(level, PAGE_SIZE), await async_db.count_words_in_level(level))
+
+    @ui.batched
+    async def load_more(e):
+        after_id = next(reversed(state["rows"]), None)
+        words = await async_db.get_words_page(state["current_level"], PAGE_SIZE, after_id=after_id)
+        # Rows appended under a select-all come in checked
+        words_list.controls.extend(make_row(w) for w in words if w['id'] not in state["rows"])
+        set_counts()
+        ui.add(words_list, load_more_btn)
+
+    load_more_btn.on_click = load_more
+
+    # --- Data events: edits made here or in another session patch the rows in place ---
+    def refresh(*controls):
+        # A cached, currently hidden view is sent whole when shown again
+        if page.route == "/words":
+            ui.add(*controls)
+
+    async def remove_rows(word_ids):
+        for word_id in word_ids:
+            entry = state["rows"].pop(word_id, None)
+            if entry:
+                words_list.controls.remove(entry[0])
+            state["selection"].discard(word_id)
+        # Another session may have removed rows not loaded here
+        state["total"] = await async_db.count_words_in_level(state["current_level"])
+        set_counts()
+        set_selection_controls()
+        refresh(words_list, word_count_text, delete_btn, bulk_menu, load_more_btn)
+
+    @ui.batched
+    async def apply_word_event(event):
+        moved_here = event.level == state["current_level"] and any(w not in state["rows"] for w in event.word_ids or ())
+        if event.type == events.WORD_DELETED and event.word_ids:
+            await remove_rows(event.word_ids)
+        elif event.type == events.WORD_UPDATED and event.word_ids and not moved_here:
+            if event.level not in (None, state["current_level"]):
+                # Moved to another level
+                await remove_rows(event.word_ids)
+                return
+            for word_id in event.word_ids:
+                entry = state["rows"].get(word_id)
+                if not entry:
+                    continue
+                _, en_text, ar_text, edit_btn = entry
+                fields = event.data[word_id]
+                en_text.value = fields.get("english_word", en_text.value)
+                ar_text.value = fields.get("arabic_word", ar_text.value)
+                for name, value in fields.items():
+                    setattr(edit_btn.data, name, value)
+                refresh(en_text, ar_text)
+        elif event.level in (None, state["current_level"]):
+            # Bulk import / relevelling: reload the level being shown
+            level = state["current_level"]
+            render_words(await async_db.get_words_page(level, PAGE_SIZE), await async_db.count_words_in_level(level),
+                         is_initial=page.route != "/words")
+
+    def on_word_event(event):
+        # Published on the DB worker that made the change; apply it on the page's loop
+        page.run_task(apply_word_event, event)
+
+    events.subscribe(on_word_event, *events.WORD_EVENTS, weak=True)
+
+    @ui.batched
+    def on_word_checked(e):
+        word_id = e.control.data
+        state["selection"].set(word_id, e.control.value)
+        update_delete_btn_visibility()
+
+    def set_selection_controls():
+        count = state["selection"].count(state["total"])
+        delete_btn.visible = bulk_menu.visible = count > 0
+        if count:
+            delete_btn.text = f"Delete Selected ({count})"
+
+    def update_delete_btn_visibility():
+        set_selection_controls()
+        ui.add(delete_btn, bulk_menu)
+
+    @ui.batched
+    def on_select_all(e):
+        # No query: the selection is "the whole level", resolved in SQL when used
+        if e.control.value:
+            state["selection"].select_all()
+        else:
+            state["selection"].clear()
+        # Only the loaded page(s) of rows have checkboxes to tick
+        for row_container in words_list.controls:
+            cb = row_container.content.controls[0]  # First control is Checkbox
+            cb.value = e.control.value
+        ui.add(words_list)
+        update_delete_btn_visibility()
+
+    select_all_checkbox.on_change = on_select_all
+
+    def confirm_delete_single(word_id):
+        async def do_delete(e):
+            await async_db.delete_word(word_id)
+            page.close(dlg)
+
+        dlg = ft.AlertDialog(
+            title=ft.Text("Delete Word"),
+            content=ft.Text("Are you sure you want to delete this word?"),
+            actions=[
+                ft.TextButton("Cancel", on_click=lambda e: page.close(dlg)),
+                ft.TextButton("Delete", on_click=do_delete),
+            ],
+        )
+        page.open(dlg)
+        page.update()
+
+    def confirm_delete_bulk(e):
+        count = state["selection"].count(state["total"])
+        async def do_delete(e):
+            deleted = await async_db.delete_words_bulk(state["selection"])
+            # Reclaim the freed pages / refresh statistics off the event loop
+            await async_db.run_blocking(after_bulk_change, deleted)
+            page.close(dlg)
+
+        dlg = ft.AlertDialog(
+            title=ft.Text("Delete Words"),
+            content=ft.Text(f"Are you sure you want to delete {count} selected words?"),
+            actions=[
+                ft.TextButton("Cancel", on_click=lambda e: page.close(dlg)),
+                ft.TextButton("Delete All", on_click=do_delete),
+            ],
+        )
+        page.open(dlg)
+        page.update()
+
+    delete_btn.on_click = confirm_delete_bulk
+
+    def open_edit_dialog(word_data):
+        en_field = ft.TextField(value=word_data['english_word'], label="English", width=250)
+        ar_field = ft.TextField(value=word_data['arabic_word'], label="Arabic", width=250)
+
+        async def save_edit(e):
+            await async_db.update_word(word_data['id'], en_field.value.strip(), ar_field.value.strip())
+            page.close(dlg)
+
+        dlg = ft.AlertDialog(
+            title=ft.Text("Edit Word"),
+            content=ft.Column([en_field, ar_field], tight=True, spacing=10),
+            actions=[
+                ft.TextButton("Cancel", on_click=lambda e: page.close(dlg)),
+                ft.TextButton("Save", on_click=save_edit),
+            ],
+        )
+        page.open(dlg)
+        page.update()
+
+    # --- Bulk edits: one statement / one transaction for the whole selection ---
+    def show_message(text):
+        page.snack_bar = ft.SnackBar(ft.Text(text))
+        page.snack_bar.open = True
+        page.update()
+
+    def open_move_dialog(e):
+        target_dd = ft.Dropdown(
+            label="Move to",
+            width=250,
+            value=str(state["current_level"] % 6 + 1),
+            options=[ft.dropdown.Option(str(i), f"Level {i}") for i in range(1, 7) if i != state["current_level"]],
+        )
+
+        async def do_move(e):
+            count = await async_db.move_words_to_level(state["selection"], int(target_dd.value))
+            page.close(dlg)
+            show_message(f"Moved {count} words to Level {target_dd.value}")
+
+        dlg = ft.AlertDialog(
+            title=ft.Text(f"Move {state['selection'].count(state['total'])} Words"),
+            content=target_dd,
+            actions=[
+                ft.TextButton("Cancel", on_click=lambda e: page.close(dlg)),
+                ft.TextButton("Move", on_click=do_move),
+            ],
+        )
+        page.open(dlg)
+        page.update()
+
+    def open_replace_dialog(e):
+        column_dd = ft.Dropdown(
+            label="In",
+            width=250,
+            value="arabic_word",
+            options=[ft.dropdown.Option("arabic_word", "Arabic"), ft.dropdown.Option("english_word", "English")],
+        )
+        find_field = ft.TextField(label="Find", width=250)
+        replace_field = ft.TextField(label="Replace with", width=250)
+
+        async def do_replace(e):
+            if not find_field.value:
+                return
+            count = await async_db.replace_in_words(state["selection"], find_field.value,
+                                                    replace_field.value or "", column_dd.value)
+            page.close(dlg)
+            show_message(f"Changed {count} words")
+
+        dlg = ft.AlertDialog(
+            title=ft.Text(f"Find & Replace in {state['selection'].count(state['total'])} Words"),
+            content=ft.Column([column_dd, find_field, replace_field], tight=True, spacing=10),
+            actions=[
+                ft.TextButton("Cancel", on_click=lambda e: page.close(dlg)),
+                ft.TextButton("Replace", on_click=do_replace),
+            ],
+        )
+        page.open(dlg)
+        page.update()
+
+    def open_multi_edit_dialog(e):
+        ids = [w for w in state["rows"] if w in state["selection"]]
+        if len(ids) > MULTI_EDIT_MAX:
+            show_message(f"Select at most {MULTI_EDIT_MAX} words to edit together")
+            return
+        fields = {}
+        for word_id in ids:
+            _, en_text, ar_text, _ = state["rows"][word_id]
+            fields[word_id] = (ft.TextField(value=en_text.value, label="English", width=200),
+                               ft.TextField(value=ar_text.value, label="Arabic", width=200))
+
+        async def save_all(e):
+            changed = []
+            for word_id, (en_field, ar_field) in fields.items():
+                _, en_text, ar_text, _ = state["rows"].get(word_id, (None, None, None, None))
+                en, ar = en_field.value.strip(), ar_field.value.strip()
+                if en_text is not None and (en, ar) != (en_text.value, ar_text.value):
+                    changed.append((word_id, en, ar))
+            await async_db.update_words_bulk(changed)
+            page.close(dlg)
+            show_message(f"Saved {len(changed)} words")
+
+        dlg = ft.AlertDialog(
+            title=ft.Text(f"Edit {len(ids)} Words"),
+            content=ft.Column([ft.Row([en, ar]) for en, ar in fields.values()],
+                              tight=True, spacing=10, scroll=ft.ScrollMode.AUTO, height=400),
+            actions=[
+                ft.TextButton("Cancel", on_click=lambda e: page.close(dlg)),
+                ft.TextButton("Save", on_click=save_all),
+            ],
+        )
+        page.open(dlg)
+        page.update()
+
+    bulk_menu.items = [
+        ft.PopupMenuItem(content=ft.Text("Move to Level"), icon=ft.Icons.DRIVE_FILE_MOVE, on_click=open_move_dialog),
+        ft.PopupMenuItem(content=ft.Text("Find & Replace"), icon=ft.Icons.FIND_REPLACE, on_click=open_replace_dialog),
+        ft.PopupMenuItem(content=ft.Text("Edit Together"), icon=ft.Icons.EDIT, on_click=open_multi_edit_dialog),
+    ]
+
+    async def on_level_tab_change(e):
+        state["current_level"] = e.control.selected_index + 1
+        await load_words()
+
+    # --- Level Tabs ---
+    level_tabs = ft.Tabs(
+        selected_index=0,
+        on_change=on_level_tab_change,
+        tabs=[ft.Tab(text=f"Level {i}") for i in range(1, 7)],
+        indicator_color="cyanAccent",
+        label_color="white",
+        unselected_label_color="white54",
+    )
+
+    # Load initial data (no .update() calls since controls aren't on page yet)
+    render_words(get_words_page(state["current_level"], PAGE_SIZE), count_words_in_level(state["current_level"]), is_initial=True)
+
+    view = ft.View(
+        route="/words",
+        controls=[
+            ft.Container(
+                content=ft.Column(
+                    [
+                        ft.Row(
+                            [
+                                ft.IconButton(ft.Icons.ARROW_BACK, icon_color="white", on_click=lambda e: page.go("/dashboard")),
+                                ft.Text("Word Manager", size=24, weight=ft.FontWeight.BOLD, color="white"),
+                            ],
+                        ),
+                        level_tabs,
+                        ft.Container(height=10),
+                        ft.Row(
+                            [
+                                select_all_checkbox,
+                                word_count_text,
+                                ft.Row([bulk_menu, delete_btn]),
+                            ],
+                            alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                        ),
+                        ft.Container(height=5),
+                        words_list,
+                        ft.Row([load_more_btn], alignment=ft.MainAxisAlignment.CENTER),
+                    ],
+                ),
+                padding=20,
+                expand=True,
+                gradient=ft.LinearGradient(
+                    begin=ft.Alignment(0, -1),
+                    end=ft.Alignment(0, 1),
+                    colors=[ft.Colors.BLUE_GREY_900, ft.Colors.BLACK],
+                )
+            )
+        ],
+        padding=0,
+    )
+    # The bus holds on_word_event weakly; the view keeps it alive
+    view.data = on_word_event
+    return view
@@ -0,0 +1,168 @@
+"""Compressed vocabulary packs.
+
+A pack is a gzip-compressed JSON-lines file. The first line is a header:
+
+    {"format": "vocab-pack", "format_version": 2, "name": "core", "version": 3, "count": 6290}
+
+Every following line is one word as a JSON array: [id, level, english_word, arabic_word].
+The id is the word's permanent id: progress, errors and attempts refer to
+words by id, so a word keeps its id in every later version of the pack and
+new words get new ids. (Version 1 packs have no id column.) Rows are
+streamed, so a pack never has to fit in memory.
+"""
+import gzip
+import json
+import os
+
+PACK_FORMAT = "vocab-pack"
+PACK_FORMAT_VERSION = 2
+PACK_EXTENSION = ".pack.gz"
+
+# Packs shipped with the app live next to the code
+PACKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "packs")
+
+
+def read_pack_header(path):
+    """Read only the header line of a pack (cheap, no full decompress)."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+    if header.get("format") != PACK_FORMAT:
+        raise ValueError(f"{path} is not a vocabulary pack")
+    if header.get("format_version", 0) > PACK_FORMAT_VERSION:
+        raise ValueError(f"{path} uses an unsupported pack format version {header.get('format_version')}")
+    return header
+
+
+def iter_pack_rows(path):
+    """Yield (id, level, english_word, arabic_word) tuples from a pack (id is None in v1 packs)."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        f.readline()  # header
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if len(row) == 3:
+                row = [None] + row
+            word_id, level, en, ar = row
+            yield word_id, int(level), en, ar
+
+
+def list_packs(packs_dir=PACKS_DIR):
+    """Return (path, header) for every pack in packs_dir, sorted by name."""
+    if not os.path.isdir(packs_dir):
+        return []
+    packs = []
+    for fname in sorted(os.listdir(packs_dir)):
+        if fname.endswith(PACK_EXTENSION):
+            path = os.path.join(packs_dir, fname)
+            packs.append((path, read_pack_header(path)))
+    return packs
+
+
+def write_pack(path, rows, name, version):
+    """Write rows of (id, level, english_word, arabic_word) to a pack file.
+
+    rows may be any iterable; the count in the header is filled in after
+    streaming, so the rows are written to a temporary body first.
+    """
+    tmp_body = path + ".body"
+    count = 0
+    with open(tmp_body, "w", encoding="utf-8") as body:
+        for word_id, level, en, ar in rows:
+            body.write(json.dumps([int(word_id), int(level), en, ar], ensure_ascii=False, separators=(",", ":")))
+            body.write("\n")
+            count += 1
+
+    header = {
+        "format": PACK_FORMAT,
+        "format_version": PACK_FORMAT_VERSION,
+        "name": name,
+        "version": int(version),
+        "count": count,
+    }
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=9) as out:
+        out.write(json.dumps(header, ensure_ascii=False) + "\n")
+        with open(tmp_body, "r", encoding="utf-8") as body:
+            for line in body:
+                out.write(line)
+    os.remove(tmp_body)
+    return count
+
+
+def build_pack_from_db(db_path, path, name, version):
+    """Build a pack from the words table of an existing SQLite database (keeping its ids)."""
+    import sqlite3
+    conn = sqlite3.connect(db_path)
+    try:
+        cur = conn.execute("SELECT id, level, english_word, arabic_word FROM words ORDER BY level, id")
+        return write_pack(path, cur, name, version)
+    finally:
+        conn.close()
+
+
+def build_vocab_db(out_path, packs=None):
+    """Write an immutable-ready vocabulary database (words + index + statistics) from packs.
+
+    Words keep their pack ids, so a rebuilt file never renumbers them. Rows
+    are streamed; a word whose id or english word was already seen (in an
+    earlier pack or the same one) is skipped. The build ("name:version" of
+    each pack) is stored in the file's meta table; installs with their own
+    copy of the words use it to merge in a newer file (database.init_db).
+    The file is built under a temp name and moved into place. Returns the
+    number of words written.
+    """
+    import sqlite3
+    from database import WORDS_SQL
+    packs = packs if packs is not None else [path for path, _ in list_packs()]
+    tmp_path = out_path + ".part"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute(WORDS_SQL)
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+        seen_ids, seen_words = set(), set()
+
+        def new_rows(path):
+            # Streamed into executemany; a repeated id or english word (in an
+            # earlier pack or earlier in this one) is skipped
+            for row in iter_pack_rows(path):
+                word_id, _, english, _ = row
+                if word_id is None:
+                    raise ValueError(f"{path} has no word ids (format version 1); rebuild it with build_pack_from_db")
+                if word_id in seen_ids or english in seen_words:
+                    continue
+                seen_ids.add(word_id)
+                seen_words.add(english)
+                yield row
+
+        count = 0
+        build = []
+        for path in packs:
+            header = read_pack_header(path)
+            build.append(f"{header['name']}:{header['version']}")
+            count += conn.executemany("INSERT INTO words (id, level, english_word, arabic_word) VALUES (?, ?, ?, ?)",
+                                      new_rows(path)).rowcount
+        conn.execute("INSERT INTO meta (key, value) VALUES ('vocab_build', ?)", (",".join(build),))
+        conn.execute("CREATE INDEX idx_words_level ON words(level, id)")
+        conn.execute("ANALYZE")
+        conn.commit()
+        # Readers open it with immutable=1, so leave no WAL/journal behind
+        conn.execute("PRAGMA journal_mode = DELETE")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp_path, out_path)
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Build a vocabulary pack from a SQLite database")
+    parser.add_argument("db", help="source database with a words table")
+    parser.add_argument("out", help="output pack path (*.pack.gz)")
+    parser.add_argument("--name", default="core")
+    parser.add_argument("--version", type=int, default=1)
+    args = parser.parse_args()
+    n = build_pack_from_db(args.db, args.out, args.name, args.version)
+    print(f"Wrote {n} words to {args.out}")
@@ -0,0 +1,152 @@
+import threading
+from database import count_words_in_level, get_words_page, get_level_word_ids, get_words_by_ids
+from compact_words import WordBlock
+from shuffle import ShuffledOrder
+
+# Words held in memory around the learner's position
+WINDOW_SIZE = 50
+# Start fetching the next chunk when fewer than this many words are left ahead
+REFILL_MARGIN = 15
+# Words kept behind the current position (for small jumps back)
+KEEP_BEHIND = 5
+
+class WordWindow:
+    """Sliding window over one level's words, in id order.
+
+    Only WINDOW_SIZE words are loaded around the starting index; the next
+    chunk is fetched on a background thread as the learner advances, so
+    opening a huge level costs the same as opening a small one.
+    """
+
+    def __init__(self, level, start_index=0, size=WINDOW_SIZE):
+        self.level = level
+        self.size = size
+        self.total = count_words_in_level(level)
+        self._lock = threading.Lock()
+        self._refilling = False
+        self.start = 0
+        self.words = WordBlock()
+        if self.total:
+            self._load_at(start_index)
+
+    def _load_at(self, index):
+        start = max(0, index - KEEP_BEHIND)
+        words = get_words_page(self.level, self.size, offset=start)
+        with self._lock:
+            self.start = start
+            self.words = words
+
+    def get(self, index):
+        """Return the word at a level position, or None if it no longer exists."""
+        with self._lock:
+            pos = index - self.start
+            word = self.words[pos] if 0 <= pos < len(self.words) else None
+        if word is None:
+            # Jump outside the window (e.g. progress reset): reload around it
+            self._load_at(index)
+            with self._lock:
+                pos = index - self.start
+                word = self.words[pos] if 0 <= pos < len(self.words) else None
+            if word is None:
+                # Past the end: words were deleted since the level was counted
+                self.total = count_words_in_level(self.level)
+        self._maybe_refill(index)
+        return word
+
+    def _maybe_refill(self, index):
+        with self._lock:
+            end = self.start + len(self.words)
+            if self._refilling or not self.words or end >= self.total or end - index > REFILL_MARGIN:
+                return
+            self._refilling = True
+            after_id = self.words.ids[-1]
+        threading.Thread(target=self._refill, args=(index, after_id), daemon=True).start()
+
+    def _refill(self, index, after_id):
+        try:
+            more = get_words_page(self.level, self.size, after_id=after_id)
+            with self._lock:
+                # Discard the chunk if the window moved (reload) while fetching
+                if self.words and self.words.ids[-1] == after_id:
+                    self.words.extend(more)
+                    drop = max(0, index - KEEP_BEHIND - self.start)
+                    if drop:
+                        self.words.drop_front(drop)
+                        self.start += drop
+        finally:
+            with self._lock:
+                self._refilling = False
+
+
+class ShuffledWordWindow:
+    """WordWindow's interface over a level walked in a seeded shuffled order.
+
+    Walk position i is level position order[i] (see shuffle.ShuffledOrder),
+    so only the seed and the position are ever saved. The order is drawn
+    over `shuffled_size` positions, the level size when the seed was set:
+    words added since are walked after it in id order, and positions left
+    past the end by deletions read as None. The level's ids are loaded once
+    (8 bytes per word) to turn positions into ids; the words themselves are
+    fetched by id, `size` at a time, ahead of the learner.
+    """
+
+    def __init__(self, level, seed, start_index=0, size=WINDOW_SIZE, shuffled_size=None):
+        self.level = level
+        self.size = size
+        self.ids = get_level_word_ids(level)
+        shuffled_size = len(self.ids) if shuffled_size is None else shuffled_size
+        self.total = max(shuffled_size, len(self.ids))
+        self.order = ShuffledOrder(shuffled_size, seed)
+        self._lock = threading.Lock()
+        self._refilling = False
+        self.words = {}  # walk position -> WordRecord (None if deleted since)
+        if self.total:
+            self._load_at(start_index)
+
+    def _word_id(self, index):
+        """Id at a walk position, or None where deletions left no word."""
+        pos = self.order[index] if index < len(self.order) else index
+        return self.ids[pos] if pos < len(self.ids) else None
+
+    def _fetch(self, start):
+        positions = range(start, min(self.total, start + self.size))
+        ids = [self._word_id(i) for i in positions]
+        by_id = {w.id: w for w in get_words_by_ids([i for i in ids if i is not None])}
+        return {i: by_id.get(word_id) for i, word_id in zip(positions, ids)}
+
+    def _load_at(self, index):
+        words = self._fetch(max(0, index - KEEP_BEHIND))
+        with self._lock:
+            self.words = words
+
+    def get(self, index):
+        """Return the word at a walk position, or None if it no longer exists."""
+        with self._lock:
+            loaded = index in self.words
+        if not loaded and 0 <= index < self.total:
+            self._load_at(index)
+        with self._lock:
+            word = self.words.get(index)
+        self._maybe_refill(index)
+        return word
+
+    def _maybe_refill(self, index):
+        with self._lock:
+            end = max(self.words, default=-1) + 1
+            if self._refilling or not self.words or end >= self.total or end - index > REFILL_MARGIN:
+                return
+            self._refilling = True
+        threading.Thread(target=self._refill, args=(index, end), daemon=True).start()
+
+    def _refill(self, index, end):
+        try:
+            more = self._fetch(end)
+            with self._lock:
+                # Discard the chunk if the window moved (reload) while fetching
+                if max(self.words, default=-1) + 1 == end:
+                    self.words.update(more)
+                    for i in [i for i in self.words if i < index - KEEP_BEHIND]:
+                        del self.words[i]
+        finally:
+            with self._lock:
+                self._refilling = False